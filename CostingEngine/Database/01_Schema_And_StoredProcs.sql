@@ -74,6 +74,50 @@ GO
 CREATE INDEX IX_TemplateComponent_Category ON costing.TemplateComponent(TemplateId, Category);
 GO
 
+-- =============================================
+-- Table Type: costing.TemplateComponentList
+-- =============================================
+-- Table-valued parameter for bulk-loading template components in a single
+-- round-trip (see costing.AddTemplateComponents).
+-- =============================================
+CREATE TYPE costing.TemplateComponentList AS TABLE (
+    TemplateId          INT NOT NULL,
+    ComponentCode       NVARCHAR(50) NOT NULL,
+    ComponentName       NVARCHAR(200) NOT NULL,
+    Category            NVARCHAR(100) NULL,
+    UnitCostUSD         DECIMAL(18, 2) NOT NULL,
+    QuantityFactor      DECIMAL(18, 4) NOT NULL,
+    QuantityType        NVARCHAR(50) NOT NULL,
+    UnitOfMeasure       NVARCHAR(50) NULL,
+    Notes               NVARCHAR(MAX) NULL,
+    
+    PRIMARY KEY (TemplateId, ComponentCode)
+);
+GO
+
+-- =============================================
+-- Stored Procedure: costing.AddTemplateComponents
+-- =============================================
+-- Inserts a batch of components passed as a table-valued parameter.
+-- One call replaces one INSERT round-trip per component.
+-- =============================================
+CREATE OR ALTER PROCEDURE costing.AddTemplateComponents
+    @Components costing.TemplateComponentList READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    
+    INSERT INTO costing.TemplateComponent
+        (TemplateId, ComponentCode, ComponentName, Category, UnitCostUSD,
+         QuantityFactor, QuantityType, UnitOfMeasure, Notes)
+    SELECT
+        TemplateId, ComponentCode, ComponentName, Category, UnitCostUSD,
+        QuantityFactor, QuantityType, UnitOfMeasure, Notes
+    FROM @Components;
+END
+GO
+
 -- =============================================
 -- Stored Procedure: costing.GenerateCostEstimate
 -- =============================================
@@ -84,6 +128,9 @@ GO
 --   2. Apply quantity factors based on input parameters (floor area, rack count, etc.).
 --   3. Calculate line costs = unit cost × computed quantity.
 --   4. Return result set with component details and costs.
+--   5. Return a second result set with per-category totals and the grand
+--      total (GROUP BY ROLLUP), so callers needing only the summary do not
+--      have to re-aggregate every line client-side.
 --
 -- Assumptions (documented for reproducibility):
 --   - Floor area is in square meters (m²).
@@ -162,10 +209,23 @@ BEGIN
         InputNumRacks = @NumRacks,
         InputNumFloors = @NumFloors
         
+    INTO #lines
     FROM costing.TemplateComponent c
     INNER JOIN costing.Template t ON c.TemplateId = t.TemplateId
-    WHERE c.TemplateId = @TemplateId
-    ORDER BY c.Category, c.ComponentCode;
+    WHERE c.TemplateId = @TemplateId;
+    
+    -- Result set 1: line items
+    SELECT *
+    FROM #lines
+    ORDER BY Category, ComponentCode;
+    
+    -- Result set 2: category subtotals plus grand total (IsGrandTotal = 1)
+    SELECT
+        Category,
+        CategoryTotalUSD = SUM(LineCostUSD),
+        IsGrandTotal = CAST(GROUPING(Category) AS BIT)
+    FROM #lines
+    GROUP BY ROLLUP(Category);
     
 END
 GO
@@ -2,9 +2,9 @@
 Client for interacting with the costing engine database.
 """
 
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 import logging
 
 from .models import (
@@ -19,12 +19,157 @@ from .models import (
 logger = logging.getLogger(__name__)
 
 
+# Parameterized statements shared by every call. Keeping the text identical
+# lets SQL Server reuse one cached plan instead of re-parsing per request.
+GET_TEMPLATES_SQL = """
+    SELECT TemplateId, TemplateCode, TemplateName, Description, ProjectType,
+           IsActive, CreatedDate, ModifiedDate
+    FROM costing.Template
+    WHERE (@P1 IS NULL OR ProjectType = @P1)
+      AND (@P2 = 0 OR IsActive = 1)
+"""
+
+GET_TEMPLATE_SQL = """
+    SELECT TemplateId, TemplateCode, TemplateName, Description, ProjectType,
+           IsActive, CreatedDate, ModifiedDate
+    FROM costing.Template
+    WHERE TemplateId = @P1
+"""
+
+GET_TEMPLATE_COMPONENTS_SQL = """
+    SELECT TemplateId, ComponentCode, ComponentName, Category,
+           UnitCostUSD, QuantityFactor, QuantityType, UnitOfMeasure, Notes
+    FROM costing.TemplateComponent
+    WHERE TemplateId = @P1
+    ORDER BY Category, ComponentCode
+"""
+
+GENERATE_ESTIMATE_SQL = "EXEC costing.GenerateCostEstimate @P1, @P2, @P3, @P4, @P5"
+
+CREATE_TEMPLATE_SQL = """
+    INSERT INTO costing.Template (TemplateName, TemplateCode, Description, ProjectType)
+    VALUES (@P1, @P2, @P3, @P4);
+    SELECT SCOPE_IDENTITY()
+"""
+
+ADD_COMPONENTS_SQL = "EXEC costing.AddTemplateComponents @P1"
+
+
+# Quantity type -> EstimateParameters attribute it scales with
+# (mirrors the CASE expression in costing.GenerateCostEstimate).
+_QUANTITY_PARAMETER = {
+    'PerSquareMeter': 'floor_area_m2',
+    'PerRack': 'num_racks',
+    'PerFloor': 'num_floors',
+}
+
+
+_CENTS = Decimal('0.01')
+
+
+def _bind_decimal_18_2(value: Any) -> Optional[Decimal]:
+    """Convert a value as a DECIMAL(18, 2) procedure parameter would (None is NULL)."""
+    if value is None:
+        return None
+    # str() first so a float binds as written (12.345), not its binary expansion;
+    # SQL Server rounds half away from zero when narrowing the scale
+    return Decimal(str(value)).quantize(_CENTS, rounding=ROUND_HALF_UP)
+
+
+def _bind_int(value: Any) -> Optional[Decimal]:
+    """Convert a value as an INT procedure parameter would (None is NULL)."""
+    return None if value is None else Decimal(int(value))
+
+
+# EstimateParameters attribute -> conversion matching the procedure's parameter type
+_PARAMETER_BINDING = {
+    'floor_area_m2': _bind_decimal_18_2,
+    'num_racks': _bind_int,
+    'num_floors': _bind_int,
+}
+
+
+def build_estimator(
+    components: List[TemplateComponent],
+    template_code: Optional[str] = None,
+    template_name: Optional[str] = None,
+) -> Callable[[EstimateParameters], CostEstimate]:
+    """
+    Build an in-process estimator for a fixed set of template components.
+    
+    Reproduces costing.GenerateCostEstimate without a database round-trip:
+    per-component constants are extracted once, so each call only multiplies
+    them by the relevant parameter. Parameters are first converted as the
+    procedure binds them (floor area rounded to DECIMAL(18, 2), counts to
+    INT); a None parameter acts as NULL and leaves the lines that use it with
+    no quantity or cost, as the procedure does.
+    
+    Lines keep the order of components. Pass them as returned by
+    get_template_components(): GET_TEMPLATE_COMPONENTS_SQL sorts with the same
+    ORDER BY Category, ComponentCode as the stored procedure, so the server's
+    collation (case-insensitive, NULL categories first) decides the order
+    rather than Python string comparison.
+    
+    Args:
+        components: Components of the template, in the order lines should appear.
+        template_code: Template code to stamp on each line.
+        template_name: Template name to stamp on each line.
+        
+    Returns:
+        Function mapping EstimateParameters to a CostEstimate.
+    """
+    prepared = [(c, _QUANTITY_PARAMETER.get(c.quantity_type)) for c in components]
+    zero = Decimal('0')
+
+    def estimate(parameters: EstimateParameters) -> CostEstimate:
+        bound = {
+            name: bind(getattr(parameters, name))
+            for name, bind in _PARAMETER_BINDING.items()
+        }
+        lines = []
+        for c, parameter in prepared:
+            if parameter is not None:
+                value = bound[parameter]
+                quantity = None if value is None else c.quantity_factor * value
+            elif c.quantity_type == 'Fixed':
+                quantity = c.quantity_factor
+            else:
+                quantity = zero  # Unknown type, same as the stored procedure
+            lines.append(EstimateLine(
+                component_code=c.component_code,
+                component_name=c.component_name,
+                category=c.category,
+                quantity_type=c.quantity_type,
+                unit_of_measure=c.unit_of_measure,
+                estimated_quantity=quantity,
+                unit_cost_usd=c.unit_cost_usd,
+                line_cost_usd=None if quantity is None else c.unit_cost_usd * quantity,
+                notes=c.notes,
+                template_code=template_code,
+                template_name=template_name,
+            ))
+        return CostEstimate(
+            lines=lines,
+            parameters=parameters,
+            cost_date=datetime.utcnow(),
+        )
+
+    return estimate
+
+
 class CostingClient:
     """
     Client for accessing the costing engine database.
     
     This is an interface-only implementation. Actual database connection
-    logic must be provided by the implementation (e.g., using pyodbc, pymssql, etc.).
+    logic must be provided by the implementation (e.g., using fastmssql).
+    
+    All data-access methods are coroutines so that concurrent estimate
+    requests overlap their database round-trips instead of blocking the
+    event loop. Implementations should create one pooled connection per
+    client (lazily, on first use) and reuse it for every call rather than
+    connecting per request, and should execute the module-level *_SQL
+    statements so the server-side plan cache is hit on every call.
     
     See README.md Integration Points section for implementation examples.
     """
@@ -35,12 +180,26 @@ class CostingClient:
         
         Args:
             connection_string: Database connection string.
-                              Implement actual connection logic using pyodbc or pymssql.
+                              The pooled connection is created lazily on first use.
+        
+        Example connection setup with fastmssql:
+        
+        from fastmssql import Connection, PoolConfig
+        
+        async def _get_connection(self) -> Connection:
+            if self._connection is None:
+                self._connection = Connection(
+                    self.connection_string,
+                    pool_config=PoolConfig(max_size=20, min_idle=2),
+                )
+            return self._connection
         """
         self.connection_string = connection_string
+        self._connection = None
+        self._specialized: Dict[int, Callable[[EstimateParameters], CostEstimate]] = {}
         logger.info("CostingClient initialized (database connection not implemented)")
 
-    def get_templates(self, project_type: Optional[str] = None, active_only: bool = True) -> List[Template]:
+    async def get_templates(self, project_type: Optional[str] = None, active_only: bool = True) -> List[Template]:
         """
         Retrieve available templates.
         
@@ -51,16 +210,26 @@ class CostingClient:
         Returns:
             List of Template objects.
             
-        Implementation should query:
-            SELECT TemplateId, TemplateCode, TemplateName, Description, ProjectType,
-                   IsActive, CreatedDate, ModifiedDate
-            FROM costing.Template
-            WHERE (@ProjectType IS NULL OR ProjectType = @ProjectType)
-              AND (@ActiveOnly = 0 OR IsActive = 1)
+        Implementation should query GET_TEMPLATES_SQL with
+        [project_type, active_only].
         """
         raise NotImplementedError("Database connection not implemented")
 
-    def get_template_components(self, template_id: int) -> List[TemplateComponent]:
+    async def get_template(self, template_id: int) -> Optional[Template]:
+        """
+        Retrieve a single template.
+        
+        Args:
+            template_id: Template ID.
+            
+        Returns:
+            The Template, or None if no template has this ID.
+            
+        Implementation should query GET_TEMPLATE_SQL with [template_id].
+        """
+        raise NotImplementedError("Database connection not implemented")
+
+    async def get_template_components(self, template_id: int) -> List[TemplateComponent]:
         """
         Retrieve components for a specific template.
         
@@ -70,16 +239,11 @@ class CostingClient:
         Returns:
             List of TemplateComponent objects.
             
-        Implementation should query:
-            SELECT TemplateId, ComponentCode, ComponentName, Category,
-                   UnitCostUSD, QuantityFactor, QuantityType, UnitOfMeasure, Notes
-            FROM costing.TemplateComponent
-            WHERE TemplateId = @TemplateId
-            ORDER BY Category, ComponentCode
+        Implementation should query GET_TEMPLATE_COMPONENTS_SQL with [template_id].
         """
         raise NotImplementedError("Database connection not implemented")
 
-    def generate_estimate(self, parameters: EstimateParameters) -> CostEstimate:
+    async def generate_estimate(self, parameters: EstimateParameters) -> CostEstimate:
         """
         Generate cost estimate using stored procedure.
         
@@ -89,6 +253,9 @@ class CostingClient:
         Returns:
             CostEstimate with line items and summary.
             
+        The procedure returns two result sets: the line items, then the
+        per-category totals with a grand-total row (IsGrandTotal = 1).
+            
         Implementation should call:
             EXEC costing.GenerateCostEstimate
                 @TemplateId = parameters.template_id,
@@ -98,52 +265,109 @@ class CostingClient:
                 @ProjectName = parameters.project_name,
                 @CostDate = @CostDate OUTPUT
         
-        Example implementation with pyodbc:
-        
-        import pyodbc
+        Example implementation with fastmssql:
         
-        conn = pyodbc.connect(self.connection_string)
-        cursor = conn.cursor()
+        # Reuse the client's pooled connection (see __init__)
+        conn = await self._get_connection()
         
         # Call stored procedure
-        cursor.execute(
-            "EXEC costing.GenerateCostEstimate ?, ?, ?, ?, ?",
-            parameters.template_id,
-            float(parameters.floor_area_m2),
-            parameters.num_racks,
-            parameters.num_floors,
-            parameters.project_name,
+        result = await conn.query(
+            GENERATE_ESTIMATE_SQL,
+            [
+                parameters.template_id,
+                parameters.floor_area_m2,
+                parameters.num_racks,
+                parameters.num_floors,
+                parameters.project_name,
+            ],
         )
         
-        # Fetch results
-        lines = []
-        for row in cursor.fetchall():
-            lines.append(EstimateLine(
-                component_code=row.ComponentCode,
-                component_name=row.ComponentName,
-                category=row.Category,
-                quantity_type=row.QuantityType,
-                unit_of_measure=row.UnitOfMeasure,
-                estimated_quantity=Decimal(str(row.EstimatedQuantity)),
-                unit_cost_usd=Decimal(str(row.UnitCostUSD)),
-                line_cost_usd=Decimal(str(row.LineCostUSD)),
-                notes=row.Notes,
-                template_code=row.TemplateCode,
-                template_name=row.TemplateName,
-            ))
+        # Build line items directly from the row iterator - avoid
+        # materializing an intermediate list of raw rows first.
+        # DECIMAL columns are bound natively as decimal.Decimal, so values
+        # are used as-is (no float -> str -> Decimal round-trip per field).
+        lines = [
+            EstimateLine(
+                component_code=row['ComponentCode'],
+                component_name=row['ComponentName'],
+                category=row['Category'],
+                quantity_type=row['QuantityType'],
+                unit_of_measure=row['UnitOfMeasure'],
+                estimated_quantity=row['EstimatedQuantity'],
+                unit_cost_usd=row['UnitCostUSD'],
+                line_cost_usd=row['LineCostUSD'],
+                notes=row['Notes'],
+                template_code=row['TemplateCode'],
+                template_name=row['TemplateName'],
+            )
+            for row in result.rows()
+        ]
         
-        cursor.close()
-        conn.close()
+        # Second result set: category subtotals + grand total (ROLLUP row),
+        # aggregated server-side so the client does not re-sum every line
+        summary = {}
+        total = Decimal('0')
+        for row in result.next_set().rows():
+            if row['IsGrandTotal']:
+                total = row['CategoryTotalUSD']
+            else:
+                summary[row['Category']] = row['CategoryTotalUSD']
         
         return CostEstimate(
             lines=lines,
             parameters=parameters,
             cost_date=datetime.utcnow(),
+            total_cost_usd=total,
+            summary_by_category=summary,
         )
         """
         raise NotImplementedError("Database connection not implemented")
 
-    def create_template(self, template: Template) -> int:
+    async def specialize(self, template_id: int) -> Callable[[EstimateParameters], CostEstimate]:
+        """
+        Return a cached in-process estimator for a template.
+        
+        Components are fetched once per template; subsequent estimates for the
+        same template skip SQL entirely. Intended for callers generating many
+        estimates from one template with varying parameters.
+        
+        Args:
+            template_id: Template ID.
+            
+        Returns:
+            Function mapping EstimateParameters to a CostEstimate.
+            
+        Raises:
+            ValueError: If the template does not exist or is inactive
+                        (costing.GenerateCostEstimate raises the same error).
+            
+        Note:
+            The estimator reflects the template and its components at the time
+            it was built and does not re-check that the template is still
+            active; call clear_specializations() after editing a template.
+        """
+        estimator = self._specialized.get(template_id)
+        if estimator is None:
+            template = await self.get_template(template_id)
+            if template is None or not template.is_active:
+                raise ValueError(f"Template {template_id} not found or inactive")
+            components = await self.get_template_components(template_id)
+            estimator = build_estimator(
+                components,
+                template_code=template.template_code,
+                template_name=template.template_name,
+            )
+            self._specialized[template_id] = estimator
+        return estimator
+
+    def clear_specializations(self, template_id: Optional[int] = None) -> None:
+        """Drop cached estimators for one template, or all if template_id is None."""
+        if template_id is None:
+            self._specialized.clear()
+        else:
+            self._specialized.pop(template_id, None)
+
+    async def create_template(self, template: Template) -> int:
         """
         Create a new template.
         
@@ -153,25 +377,34 @@ class CostingClient:
         Returns:
             ID of newly created template.
             
-        Implementation should execute:
-            INSERT INTO costing.Template (TemplateName, TemplateCode, Description, ProjectType)
-            VALUES (?, ?, ?, ?)
-            SELECT SCOPE_IDENTITY()
+        Implementation should execute CREATE_TEMPLATE_SQL with
+        [template_name, template_code, description, project_type].
         """
         raise NotImplementedError("Database connection not implemented")
 
-    def add_component(self, component: TemplateComponent) -> None:
+    async def add_component(self, component: TemplateComponent) -> None:
         """
         Add a component to a template.
         
         Args:
             component: Component to add.
             
-        Implementation should execute:
-            INSERT INTO costing.TemplateComponent
+        Single-row convenience wrapper around add_components().
+        """
+        await self.add_components([component])
+
+    async def add_components(self, components: List[TemplateComponent]) -> None:
+        """
+        Add several components in a single round-trip.
+        
+        Args:
+            components: Components to add (may span templates).
+            
+        Implementation should execute ADD_COMPONENTS_SQL, passing all rows as
+        one costing.TemplateComponentList table-valued parameter, with each
+        row holding the component's fields in column order:
             (TemplateId, ComponentCode, ComponentName, Category, UnitCostUSD,
              QuantityFactor, QuantityType, UnitOfMeasure, Notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         raise NotImplementedError("Database connection not implemented")
 
@@ -179,7 +412,8 @@ class CostingClient:
 # Example usage (when database connection is implemented):
 if __name__ == "__main__":
     # Replace with actual connection string:
-    # client = CostingClient("Driver={SQL Server};Server=localhost;Database=CostingDB;Trusted_Connection=yes;")
+    # import asyncio
+    # client = CostingClient("Server=localhost;Database=CostingDB;Integrated Security=true;")
     
     # params = EstimateParameters(
     #     template_id=1,
@@ -188,7 +422,7 @@ if __name__ == "__main__":
     #     project_name="Example Data Center"
     # )
     
-    # estimate = client.generate_estimate(params)
+    # estimate = asyncio.run(client.generate_estimate(params))
     
     # print(f"Total Cost: ${estimate.total_cost_usd:,.2f}")
     # for category, total in estimate.summary_by_category.items():
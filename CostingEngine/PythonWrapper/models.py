@@ -2,13 +2,18 @@
 Data models for costing engine.
 """
 
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, List, Optional
 from decimal import Decimal
 
 
-@dataclass
+# __slots__ for high-volume records; dataclass(slots=True) requires Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class Template:
     """
     Represents a cost estimation template.
@@ -33,7 +38,7 @@ class Template:
     modified_date: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class TemplateComponent:
     """
     Represents a component within a template.
@@ -79,7 +84,7 @@ class EstimateParameters:
     project_name: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class EstimateLine:
     """
     Single line item in a cost estimate.
@@ -90,9 +95,11 @@ class EstimateLine:
         category: Component category.
         quantity_type: How quantity was calculated.
         unit_of_measure: Unit of measure.
-        estimated_quantity: Computed quantity based on parameters.
+        estimated_quantity: Computed quantity based on parameters (None if the
+                            parameter it scales with was NULL).
         unit_cost_usd: Cost per unit.
-        line_cost_usd: Total cost for this line (quantity × unit cost).
+        line_cost_usd: Total cost for this line (quantity × unit cost; None
+                       when estimated_quantity is None).
         notes: Additional information.
         template_code: Code of template used.
         template_name: Name of template used.
@@ -102,9 +109,9 @@ class EstimateLine:
     category: str
     quantity_type: str
     unit_of_measure: Optional[str]
-    estimated_quantity: Decimal
+    estimated_quantity: Optional[Decimal]
     unit_cost_usd: Decimal
-    line_cost_usd: Decimal
+    line_cost_usd: Optional[Decimal]
     notes: Optional[str] = None
     template_code: Optional[str] = None
     template_name: Optional[str] = None
@@ -119,26 +126,42 @@ class CostEstimate:
         lines: List of cost estimate line items.
         parameters: Input parameters used to generate estimate.
         cost_date: When estimate was generated.
-        total_cost_usd: Sum of all line costs.
-        summary_by_category: Dictionary mapping category to total cost.
+        total_cost_usd: Sum of all line costs. Computed from lines unless
+                        supplied (e.g., from the stored procedure's summary result set).
+        summary_by_category: Dictionary mapping category to total cost. Computed
+                             from lines unless supplied. Each field is
+                             computed independently, so supplying only one
+                             keeps it as given.
     """
     lines: List[EstimateLine]
     parameters: EstimateParameters
     cost_date: datetime
-    total_cost_usd: Decimal = field(init=False)
-    summary_by_category: dict = field(init=False)
+    total_cost_usd: Optional[Decimal] = None
+    summary_by_category: Optional[dict] = None
 
     def __post_init__(self):
-        """Calculate derived fields."""
-        total = sum(line.line_cost_usd for line in self.lines)
-        object.__setattr__(self, 'total_cost_usd', total if self.lines else Decimal('0'))
-        
-        summary = {}
+        """Calculate derived fields not already supplied by the database."""
+        if self.total_cost_usd is not None and self.summary_by_category is not None:
+            return
+
+        # One pass over the lines accumulating total and subtotals together.
+        # Kept in Decimal: LineCostUSD has more than 2 decimal places.
+        # Like SQL SUM, NULL line costs are skipped, and a category whose
+        # costs are all NULL totals None.
+        total = Decimal('0') if not self.lines else None
+        summary: Dict[Optional[str], Optional[Decimal]] = {}
         for line in self.lines:
-            if line.category not in summary:
-                summary[line.category] = Decimal('0')
-            summary[line.category] += line.line_cost_usd
-        object.__setattr__(self, 'summary_by_category', summary)
+            cost = line.line_cost_usd
+            subtotal = summary.get(line.category)
+            if cost is None:
+                summary[line.category] = subtotal
+                continue
+            summary[line.category] = cost if subtotal is None else subtotal + cost
+            total = cost if total is None else total + cost
+        if self.summary_by_category is None:
+            object.__setattr__(self, 'summary_by_category', summary)
+        if self.total_cost_usd is None:
+            object.__setattr__(self, 'total_cost_usd', total)
 
 
 
@@ -0,0 +1,169 @@
+"""
+Unit tests for the costing client's in-process estimators.
+"""
+
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from CostingEngine.PythonWrapper import (
+    CostEstimate,
+    CostingClient,
+    EstimateParameters,
+    Template,
+    TemplateComponent,
+)
+from CostingEngine.PythonWrapper.client import build_estimator
+
+
+def _component(code, quantity_type, factor="2", unit_cost="10.00", category="Equipment"):
+    """TemplateComponent with the fields the estimator reads."""
+    return TemplateComponent(
+        template_id=1,
+        component_code=code,
+        component_name=code.title(),
+        category=category,
+        unit_cost_usd=Decimal(unit_cost),
+        quantity_factor=Decimal(factor),
+        quantity_type=quantity_type,
+        unit_of_measure="ea",
+    )
+
+
+PARAMS = EstimateParameters(
+    template_id=1,
+    floor_area_m2=Decimal("500.5"),
+    num_racks=20,
+    num_floors=3,
+)
+
+
+class TestBuildEstimator:
+    @pytest.mark.parametrize("quantity_type, expected", [
+        pytest.param("PerSquareMeter", Decimal("1001.0"), id="per_square_meter"),
+        pytest.param("PerRack", Decimal("40"), id="per_rack"),
+        pytest.param("PerFloor", Decimal("6"), id="per_floor"),
+        pytest.param("Fixed", Decimal("2"), id="fixed"),
+        pytest.param("PerBanana", Decimal("0"), id="unknown"),
+    ])
+    def test_quantity_by_type(self, quantity_type, expected):
+        """Quantities should follow the stored procedure's CASE expression."""
+        line, = build_estimator([_component("C1", quantity_type)])(PARAMS).lines
+        assert line.estimated_quantity == expected
+        assert line.line_cost_usd == expected * Decimal("10.00")
+
+    def test_totals(self):
+        """CostEstimate totals should sum the line costs, per category and overall."""
+        estimate = build_estimator([
+            _component("CAB", "PerRack", factor="1", unit_cost="5.25", category="Cabling"),
+            _component("PDU", "PerRack", factor="2", unit_cost="100.00"),
+            _component("UPS", "Fixed", factor="1", unit_cost="2500.00"),
+        ])(PARAMS)
+
+        assert [line.line_cost_usd for line in estimate.lines] == [
+            Decimal("105.00"), Decimal("4000.00"), Decimal("2500.00"),
+        ]
+        assert estimate.summary_by_category == {
+            "Cabling": Decimal("105.00"),
+            "Equipment": Decimal("6500.00"),
+        }
+        assert estimate.total_cost_usd == Decimal("6605.00")
+        assert estimate.parameters is PARAMS
+
+    def test_float_floor_area_binds_as_decimal_18_2(self):
+        """A float floor area should round to 2 places, as the DECIMAL(18, 2) parameter does."""
+        params = EstimateParameters(template_id=1, floor_area_m2=12.345)
+        line, = build_estimator([_component("C1", "PerSquareMeter")])(params).lines
+        assert line.estimated_quantity == Decimal("24.70")
+        assert line.line_cost_usd == Decimal("247.0000")
+
+    def test_null_parameter_gives_null_line(self):
+        """A None parameter should leave its lines without quantity or cost, like SQL NULL."""
+        params = EstimateParameters(template_id=1, num_racks=None)
+        estimate = build_estimator([
+            _component("PDU", "PerRack"),
+            _component("UPS", "Fixed", category="Power"),
+        ])(params)
+
+        pdu, ups = estimate.lines
+        assert pdu.estimated_quantity is None and pdu.line_cost_usd is None
+        assert ups.line_cost_usd == Decimal("20.00")
+        # SUM skips NULLs; an all-NULL category totals NULL
+        assert estimate.summary_by_category == {"Equipment": None, "Power": Decimal("20.00")}
+        assert estimate.total_cost_usd == Decimal("20.00")
+
+    def test_keeps_component_order(self):
+        """Lines should appear in the order components were given, not re-sorted."""
+        estimate = build_estimator([
+            _component("b", "Fixed"),
+            _component("A", "Fixed"),
+        ])(PARAMS)
+        assert [line.component_code for line in estimate.lines] == ["b", "A"]
+
+    def test_template_metadata_on_lines(self):
+        """Every line should carry the template code and name."""
+        estimator = build_estimator(
+            [_component("C1", "Fixed"), _component("C2", "PerRack")],
+            template_code="DC_RACK_42U_STD",
+            template_name="Data Center Rack Standard",
+        )
+        for line in estimator(PARAMS).lines:
+            assert line.template_code == "DC_RACK_42U_STD"
+            assert line.template_name == "Data Center Rack Standard"
+
+
+class TestCostEstimate:
+    @pytest.mark.parametrize("supplied", [
+        pytest.param({"total_cost_usd": Decimal("999.99")}, id="total_only"),
+        pytest.param({"summary_by_category": {"Equipment": Decimal("1.00")}}, id="summary_only"),
+    ])
+    def test_supplied_field_kept(self, supplied):
+        """A supplied total or summary should be kept; only the missing one is computed."""
+        lines = build_estimator([_component("C1", "Fixed")])(PARAMS).lines
+        estimate = CostEstimate(lines=lines, parameters=PARAMS, cost_date=datetime(2024, 1, 1), **supplied)
+
+        computed = {"total_cost_usd": Decimal("20.00"), "summary_by_category": {"Equipment": Decimal("20.00")}}
+        computed.update(supplied)
+        assert estimate.total_cost_usd == computed["total_cost_usd"]
+        assert estimate.summary_by_category == computed["summary_by_category"]
+
+
+class _StubClient(CostingClient):
+    """CostingClient serving one template from memory, counting fetches."""
+
+    def __init__(self, template):
+        super().__init__()
+        self.template = template
+        self.fetches = 0
+
+    async def get_template(self, template_id):
+        return self.template
+
+    async def get_template_components(self, template_id):
+        self.fetches += 1
+        return [_component("C1", "Fixed")]
+
+
+class TestSpecialize:
+    def test_stamps_template_and_caches(self):
+        """specialize() should fill template metadata and fetch components once."""
+        client = _StubClient(Template(template_id=1, template_code="DC", template_name="Rack"))
+
+        estimator = asyncio.run(client.specialize(1))
+        assert asyncio.run(client.specialize(1)) is estimator
+        assert client.fetches == 1
+
+        line, = estimator(PARAMS).lines
+        assert (line.template_code, line.template_name) == ("DC", "Rack")
+
+    @pytest.mark.parametrize("template", [
+        pytest.param(None, id="missing"),
+        pytest.param(Template(template_id=1, template_code="DC", template_name="Rack", is_active=False),
+                     id="inactive"),
+    ])
+    def test_rejects_unusable_template(self, template):
+        """Missing or inactive templates should raise, like the stored procedure."""
+        with pytest.raises(ValueError, match="not found or inactive"):
+            asyncio.run(_StubClient(template).specialize(1))
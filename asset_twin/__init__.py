@@ -7,8 +7,9 @@ pumps, HVAC, and other building equipment.
 
 from .twin import AssetTwin
 from .config import TwinConfig, MaintenanceThresholds
-from .rules import RuleEngine, MaintenanceRule, RuleResult
-from .telemetry import TelemetryPoint
+from .rules import RuleEngine, MaintenanceRule, RuleResult, RuleContext, WindowStats, WindowStatsRule
+from .telemetry import TelemetryPoint, TelemetryBuffer
+from .detectors import BucketDetector
 
 __all__ = [
     'AssetTwin',
@@ -17,7 +18,12 @@ __all__ = [
     'RuleEngine',
     'MaintenanceRule',
     'RuleResult',
+    'RuleContext',
+    'WindowStats',
+    'WindowStatsRule',
     'TelemetryPoint',
+    'TelemetryBuffer',
+    'BucketDetector',
 ]
 
 __version__ = '1.0.0'
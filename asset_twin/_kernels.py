@@ -0,0 +1,47 @@
+"""
+Window reduction kernels shared by the built-in maintenance rules.
+
+Operate directly on the typed arrays of a TelemetryBuffer so that all
+per-point work happens inside C-level builtins (bisect, math.fsum, max).
+
+Kept in pure Python on purpose: the package has no runtime dependencies
+or compiled extensions, so it installs unchanged on embedded gateways. A
+compiled implementation would have to keep the window_stats() signature
+so that rules.py can keep importing it from here.
+"""
+
+from bisect import bisect_left
+from math import fsum
+from typing import Optional, Sequence, Tuple
+
+
+def window_stats(
+    timestamps_ns: Sequence[int],
+    flow: Sequence[float],
+    temperature: Sequence[float],
+    cutoff_ns: int,
+    min_points: int,
+    lo: int = 0,
+) -> Tuple[int, Optional[float], Optional[float]]:
+    """
+    Compute flow and temperature aggregates over the evaluation window.
+    
+    Args:
+        timestamps_ns: Ascending measurement times (epoch nanoseconds).
+        flow: Flow values aligned with timestamps_ns.
+        temperature: Temperature values aligned with timestamps_ns.
+        cutoff_ns: Start of the window (inclusive).
+        min_points: Minimum points required; aggregation is skipped below this.
+        lo: First index to consider (e.g., TelemetryBuffer.head); earlier
+            entries are ignored without being searched.
+        
+    Returns:
+        (count, avg_flow, max_temperature). The aggregates are None when
+        count < min_points (or the window is empty).
+    """
+    start = bisect_left(timestamps_ns, cutoff_ns, lo)
+    count = len(timestamps_ns) - start
+    if count < min_points or count == 0:
+        return count, None, None
+    # fsum: one C pass with exact rounding, so long windows do not drift
+    return count, fsum(flow[start:]) / count, max(temperature[start:])
@@ -0,0 +1,86 @@
+"""
+Streaming degradation detectors for asset twins.
+
+Detectors consume one measurement at a time in O(1) and keep only a few
+integers of state, so a twin can track sustained degradation without
+rescanning its telemetry window.
+"""
+
+
+class BucketDetector:
+    """
+    Bucket algorithm for detecting sustained performance degradation.
+
+    Samples worse than the current bucket's target fill the bucket; good
+    samples drain it. A full bucket (more than ``depth`` net bad samples)
+    moves to the next bucket, whose target is one ``sigma`` further from
+    ``mean``; a drained bucket moves back. Degradation is reported once the
+    detector climbs past the last bucket, i.e. only when bad samples keep
+    outnumbering good ones across all buckets - isolated dips never alarm.
+
+    "Worse" here means lower (e.g., flow): bucket b's target is
+    ``mean - (b - 1) * sigma``.
+
+    Attributes:
+        mean: Expected level of the measurement.
+        sigma: Expected spread; the step between bucket targets.
+        buckets: Number of buckets (B); degraded once bucket > buckets.
+        depth: Bucket depth (D); net bad samples needed to overflow a bucket.
+        bucket: Current bucket (b), starting at 1.
+        level: Fill level of the current bucket (d).
+    """
+
+    __slots__ = ("mean", "sigma", "buckets", "depth", "bucket", "level")
+
+    def __init__(self, mean: float, sigma: float, buckets: int = 5, depth: int = 10):
+        """
+        Args:
+            mean: Expected level of the measurement.
+            sigma: Expected spread of the measurement (> 0).
+            buckets: Number of buckets before degradation is reported.
+            depth: Net bad samples needed to overflow one bucket.
+
+        Raises:
+            ValueError: If sigma is not positive or buckets/depth are < 1.
+        """
+        if sigma <= 0:
+            raise ValueError(f"sigma must be > 0, got {sigma}")
+        if buckets < 1 or depth < 1:
+            raise ValueError(f"buckets and depth must be >= 1, got {buckets} and {depth}")
+        self.mean = mean
+        self.sigma = sigma
+        self.buckets = buckets
+        self.depth = depth
+        self.reset()
+
+    @property
+    def degraded(self) -> bool:
+        """True once degradation has been sustained past the last bucket."""
+        return self.bucket > self.buckets
+
+    def update(self, value: float) -> None:
+        """Fold in one measurement."""
+        if value < self.mean - (self.bucket - 1) * self.sigma:
+            self.level += 1
+            if self.level > self.depth:
+                self.bucket += 1
+                self.level = 0
+        else:
+            self.level -= 1
+            if self.level < 0:
+                if self.bucket > 1:
+                    self.bucket -= 1
+                    self.level = self.depth
+                else:
+                    self.level = 0
+
+    def reset(self) -> None:
+        """Return to the first, empty bucket."""
+        self.bucket = 1
+        self.level = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"BucketDetector(bucket={self.bucket}/{self.buckets}, "
+            f"level={self.level}/{self.depth})"
+        )
@@ -4,12 +4,31 @@ Rule engine for predictive maintenance decisions.
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import List, Optional
+from functools import lru_cache
+from time import time_ns
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Union
 
-from .telemetry import TelemetryPoint
+from ._kernels import window_stats
+from .telemetry import TelemetryBuffer, TelemetryPoint
 from .config import TwinConfig
 
+if TYPE_CHECKING:
+    # Only needed for annotations; concurrent.futures pulls in threading and
+    # logging, which short-lived callers should not pay for at import.
+    from concurrent.futures import Executor
+
+
+# Rules accept either the columnar buffer or a plain sequence of points
+Telemetry = Union[TelemetryBuffer, Sequence[TelemetryPoint]]
+
+
+def as_buffer(telemetry: Telemetry) -> TelemetryBuffer:
+    """Return telemetry as a sorted TelemetryBuffer, converting point sequences once."""
+    if isinstance(telemetry, TelemetryBuffer):
+        telemetry.flush()
+        return telemetry
+    return TelemetryBuffer.from_points(telemetry)
+
 
 @dataclass
 class RuleResult:
@@ -28,6 +47,107 @@ class RuleResult:
     triggered_values: Optional[dict] = None
 
 
+@dataclass
+class WindowStats:
+    """
+    Aggregates over the evaluation window, computed once per evaluation
+    and shared by every WindowStatsRule.
+    
+    Attributes:
+        count: Number of telemetry points in the window.
+        avg_flow: Mean flow over the window (None if count < min_data_points).
+        max_temperature: Maximum temperature over the window (None if count < min_data_points).
+    """
+    count: int
+    avg_flow: Optional[float]
+    max_temperature: Optional[float]
+
+
+_NS_PER_DAY = 86_400 * 1_000_000_000
+
+
+def window_cutoff_ns(config: TwinConfig, now_ns: Optional[int] = None) -> int:
+    """
+    Return the start of config's evaluation window in epoch nanoseconds.
+    
+    Args:
+        config: Asset twin configuration with thresholds.
+        now_ns: Current time in epoch nanoseconds. Defaults to time.time_ns().
+    """
+    thresholds = config.thresholds
+    assert thresholds is not None  # Guaranteed by TwinConfig.__post_init__
+
+    if now_ns is None:
+        now_ns = time_ns()
+    return now_ns - thresholds.evaluation_window_days * _NS_PER_DAY
+
+
+def compute_window_stats(
+    config: TwinConfig,
+    telemetry: TelemetryBuffer,
+    cutoff_ns: Optional[int] = None,
+) -> WindowStats:
+    """Run the shared window kernel for config's evaluation window."""
+    thresholds = config.thresholds
+    assert thresholds is not None  # Guaranteed by TwinConfig.__post_init__
+
+    if cutoff_ns is None:
+        cutoff_ns = window_cutoff_ns(config)
+    return WindowStats(*window_stats(
+        telemetry.timestamps_ns,
+        telemetry.flow,
+        telemetry.temperature,
+        cutoff_ns,
+        thresholds.min_data_points,
+        telemetry.head,
+    ))
+
+
+@dataclass
+class RuleContext:
+    """
+    Everything a WindowStatsRule needs, computed once per evaluation and
+    shared by every such rule.
+    
+    Attributes:
+        config: Asset twin configuration.
+        telemetry: The sorted telemetry buffer being evaluated.
+        cutoff_ns: Start of the evaluation window in epoch nanoseconds.
+        stats: Aggregates over the evaluation window.
+        flow_threshold: Average flow below which flow is degraded
+                        (rated_flow * flow_degradation_ratio).
+        temperature_threshold: Maximum temperature above which an excursion
+                               is reported (failure_temperature - margin).
+    """
+    config: TwinConfig
+    telemetry: TelemetryBuffer
+    cutoff_ns: int
+    stats: WindowStats
+    flow_threshold: float
+    temperature_threshold: float
+
+
+def build_rule_context(
+    config: TwinConfig,
+    telemetry: TelemetryBuffer,
+    cutoff_ns: Optional[int] = None,
+) -> RuleContext:
+    """Scan the evaluation window and precompute config-derived thresholds."""
+    thresholds = config.thresholds
+    assert thresholds is not None  # Guaranteed by TwinConfig.__post_init__
+
+    if cutoff_ns is None:
+        cutoff_ns = window_cutoff_ns(config)
+    return RuleContext(
+        config=config,
+        telemetry=telemetry,
+        cutoff_ns=cutoff_ns,
+        stats=compute_window_stats(config, telemetry, cutoff_ns),
+        flow_threshold=thresholds.flow_degradation_ratio * config.rated_flow,
+        temperature_threshold=config.failure_temperature - thresholds.temperature_margin_celsius,
+    )
+
+
 class MaintenanceRule(ABC):
     """
     Abstract base class for maintenance prediction rules.
@@ -37,55 +157,92 @@ class MaintenanceRule(ABC):
     def evaluate(
         self,
         config: TwinConfig,
-        telemetry: List[TelemetryPoint],
+        telemetry: TelemetryBuffer,
+        cutoff_ns: Optional[int] = None,
     ) -> RuleResult:
         """
         Evaluate whether maintenance is needed based on telemetry.
         
         Args:
             config: Asset twin configuration with thresholds.
-            telemetry: Historical telemetry points (ordered by timestamp).
+            telemetry: Historical telemetry ordered by timestamp. RuleEngine
+                       passes a TelemetryBuffer; iterating it yields TelemetryPoint.
+            cutoff_ns: Start of the evaluation window in epoch nanoseconds.
+                       Computed from config when None.
             
         Returns:
             RuleResult indicating whether maintenance is needed and why.
         """
         pass
 
+    # Rough relative cost of evaluate(); RuleEngine.needs_maintenance runs
+    # cheaper rules first among those that have triggered equally often
+    relative_cost: float = 1.0
+
     @property
     def name(self) -> str:
         """Return rule name for logging and reporting."""
         return self.__class__.__name__
 
 
-class FlowDegradationRule(MaintenanceRule):
+class WindowStatsRule(MaintenanceRule):
     """
-    Rule that checks for flow degradation below rated capacity.
+    Base class for rules that only need the shared window aggregates.
     
-    Triggers maintenance if average flow over the evaluation window
-    drops below the configured threshold.
+    RuleEngine builds one RuleContext per evaluation and passes it to
+    evaluate_context() of every such rule, so the telemetry window is
+    scanned and the thresholds derived once no matter how many of these
+    rules are registered. Calling evaluate() directly builds the context
+    for this rule alone.
     """
 
     def evaluate(
         self,
         config: TwinConfig,
-        telemetry: List[TelemetryPoint],
+        telemetry: Telemetry,
+        cutoff_ns: Optional[int] = None,
     ) -> RuleResult:
+        """Build the rule context from telemetry and evaluate against it."""
+        return self.evaluate_context(build_rule_context(config, as_buffer(telemetry), cutoff_ns))
+
+    @abstractmethod
+    def evaluate_context(self, ctx: RuleContext) -> RuleResult:
+        """
+        Evaluate whether maintenance is needed from a precomputed context.
+        
+        Args:
+            ctx: Window aggregates and thresholds for the asset being evaluated.
+            
+        Returns:
+            RuleResult indicating whether maintenance is needed and why.
+        """
+        pass
+
+
+class FlowDegradationRule(WindowStatsRule):
+    """
+    Rule that checks for flow degradation below rated capacity.
+    
+    Triggers maintenance if average flow over the evaluation window
+    drops below the configured threshold.
+    """
+
+    def evaluate_context(self, ctx: RuleContext) -> RuleResult:
         """Check if flow has degraded below acceptable levels."""
+        config = ctx.config
         thresholds = config.thresholds
         assert thresholds is not None  # Guaranteed by TwinConfig.__post_init__
+        stats = ctx.stats
 
-        cutoff = datetime.utcnow() - timedelta(days=thresholds.evaluation_window_days)
-        window = [t for t in telemetry if t.timestamp >= cutoff]
-
-        if len(window) < thresholds.min_data_points:
+        avg_flow = stats.avg_flow
+        if avg_flow is None:
             return RuleResult(
                 needs_maintenance=False,
-                reason=f"Insufficient data: {len(window)} points (need {thresholds.min_data_points})",
+                reason=f"Insufficient data: {stats.count} points (need {thresholds.min_data_points})",
                 confidence=0.0,
             )
 
-        avg_flow = sum(t.flow for t in window) / len(window)
-        threshold_flow = thresholds.flow_degradation_ratio * config.rated_flow
+        threshold_flow = ctx.flow_threshold
 
         if avg_flow < threshold_flow:
             return RuleResult(
@@ -97,7 +254,7 @@ class FlowDegradationRule(MaintenanceRule):
                     "avg_flow": avg_flow,
                     "threshold_flow": threshold_flow,
                     "rated_flow": config.rated_flow,
-                    "data_points": len(window),
+                    "data_points": stats.count,
                 },
             )
 
@@ -107,7 +264,7 @@ class FlowDegradationRule(MaintenanceRule):
         )
 
 
-class TemperatureExcursionRule(MaintenanceRule):
+class TemperatureExcursionRule(WindowStatsRule):
     """
     Rule that checks for temperature approaching failure threshold.
     
@@ -115,27 +272,22 @@ class TemperatureExcursionRule(MaintenanceRule):
     exceeds (failure_temperature - margin).
     """
 
-    def evaluate(
-        self,
-        config: TwinConfig,
-        telemetry: List[TelemetryPoint],
-    ) -> RuleResult:
+    def evaluate_context(self, ctx: RuleContext) -> RuleResult:
         """Check if temperature is approaching failure levels."""
+        config = ctx.config
         thresholds = config.thresholds
         assert thresholds is not None
+        stats = ctx.stats
 
-        cutoff = datetime.utcnow() - timedelta(days=thresholds.evaluation_window_days)
-        window = [t for t in telemetry if t.timestamp >= cutoff]
-
-        if len(window) < thresholds.min_data_points:
+        max_temp = stats.max_temperature
+        if max_temp is None:
             return RuleResult(
                 needs_maintenance=False,
-                reason=f"Insufficient data: {len(window)} points (need {thresholds.min_data_points})",
+                reason=f"Insufficient data: {stats.count} points (need {thresholds.min_data_points})",
                 confidence=0.0,
             )
 
-        max_temp = max(t.temperature for t in window)
-        threshold_temp = config.failure_temperature - thresholds.temperature_margin_celsius
+        threshold_temp = ctx.temperature_threshold
 
         if max_temp > threshold_temp:
             return RuleResult(
@@ -147,7 +299,7 @@ class TemperatureExcursionRule(MaintenanceRule):
                     "max_temperature": max_temp,
                     "threshold_temperature": threshold_temp,
                     "failure_temperature": config.failure_temperature,
-                    "data_points": len(window),
+                    "data_points": stats.count,
                 },
             )
 
@@ -157,12 +309,102 @@ class TemperatureExcursionRule(MaintenanceRule):
         )
 
 
+class FastFlowDegradationRule(MaintenanceRule):
+    """
+    Constant-time flow degradation check against the buffer's streaming EWMA.
+    
+    Reads TelemetryBuffer.flow_ewma instead of scanning the window, so its
+    cost does not grow with the amount of telemetry. Requires a buffer
+    created with ewma_tau_ns (AssetTwin enables it); FlowDegradationRule
+    remains the exact windowed check, e.g. for backtests.
+    
+    Confidence grows with how far the smoothed flow sits below the threshold
+    relative to its own standard deviation: deficit / (deficit + std).
+    """
+
+    relative_cost = 0.1  # O(1): no window scan
+
+    def evaluate(
+        self,
+        config: TwinConfig,
+        telemetry: Telemetry,
+        cutoff_ns: Optional[int] = None,
+    ) -> RuleResult:
+        """Check the smoothed flow level against the degradation threshold."""
+        thresholds = config.thresholds
+        assert thresholds is not None  # Guaranteed by TwinConfig.__post_init__
+
+        ewma = telemetry.flow_ewma if isinstance(telemetry, TelemetryBuffer) else None
+        if ewma is None:
+            return RuleResult(
+                needs_maintenance=False,
+                reason="EWMA tracking not enabled for this telemetry",
+                confidence=0.0,
+            )
+        if ewma.count < thresholds.min_data_points:
+            return RuleResult(
+                needs_maintenance=False,
+                reason=f"Insufficient data: {ewma.count} points (need {thresholds.min_data_points})",
+                confidence=0.0,
+            )
+
+        threshold_flow = thresholds.flow_degradation_ratio * config.rated_flow
+        ewma_flow = ewma.mean
+
+        if ewma_flow < threshold_flow:
+            deficit = threshold_flow - ewma_flow
+            std = ewma.variance ** 0.5
+            return RuleResult(
+                needs_maintenance=True,
+                reason=f"Flow degradation detected (EWMA): ewma={ewma_flow:.2f}, "
+                       f"threshold={threshold_flow:.2f} ({thresholds.flow_degradation_ratio*100}% of rated)",
+                confidence=deficit / (deficit + std),
+                triggered_values={
+                    "ewma_flow": ewma_flow,
+                    "ewma_flow_std": std,
+                    "threshold_flow": threshold_flow,
+                    "rated_flow": config.rated_flow,
+                    "data_points": ewma.count,
+                },
+            )
+
+        return RuleResult(
+            needs_maintenance=False,
+            reason=f"Flow normal (EWMA): ewma={ewma_flow:.2f} >= threshold={threshold_flow:.2f}",
+        )
+
+
+@lru_cache(maxsize=None)
+def _accepts_cutoff(rule_class: type) -> bool:
+    """True if rule_class.evaluate takes cutoff_ns (rules written before it existed do not)."""
+    import inspect  # Only reached once per rule class
+
+    try:
+        params = inspect.signature(rule_class.evaluate).parameters
+    except (TypeError, ValueError):
+        return False
+    return "cutoff_ns" in params or any(p.kind is p.VAR_KEYWORD for p in params.values())
+
+
+def _evaluate_rule(
+    rule: MaintenanceRule,
+    config: TwinConfig,
+    telemetry: TelemetryBuffer,
+    cutoff_ns: int,
+) -> RuleResult:
+    """Call rule.evaluate, forwarding the shared cutoff when the rule accepts it."""
+    if _accepts_cutoff(type(rule)):
+        return rule.evaluate(config, telemetry, cutoff_ns=cutoff_ns)
+    return rule.evaluate(config, telemetry)
+
+
 class RuleEngine:
     """
     Orchestrates evaluation of multiple maintenance rules.
     
     Runs all registered rules and aggregates results to determine
-    if maintenance is needed.
+    if maintenance is needed. Rules are registered by class name (at most
+    one rule per class) and evaluated in registration order.
     """
 
     def __init__(self, rules: Optional[List[MaintenanceRule]] = None):
@@ -171,57 +413,180 @@ class RuleEngine:
         
         Args:
             rules: List of MaintenanceRule instances. Uses default rules if None.
+            
+        Raises:
+            ValueError: If two rules share a class name.
         """
         if rules is None:
             # Default rule set
-            self.rules = [
+            rules = [
                 FlowDegradationRule(),
                 TemperatureExcursionRule(),
             ]
-        else:
-            self.rules = rules
+        self.rules = rules
+        # How often each rule has triggered; orders needs_maintenance()
+        self._trigger_counts: Dict[str, int] = {}
+
+    @property
+    def rules(self) -> List[MaintenanceRule]:
+        """Registered rules, in evaluation order (a new list on each access)."""
+        return list(self._rules.values())
+
+    @rules.setter
+    def rules(self, rules: List[MaintenanceRule]) -> None:
+        self._rules: Dict[str, MaintenanceRule] = {}
+        for rule in rules:
+            self.add_rule(rule)
+
+    @property
+    def rule_names(self) -> List[str]:
+        """Class names of the registered rules, in evaluation order (computed at registration)."""
+        return list(self._rules)
 
     def evaluate(
         self,
         config: TwinConfig,
-        telemetry: List[TelemetryPoint],
+        telemetry: Telemetry,
+        cutoff_ns: Optional[int] = None,
     ) -> List[RuleResult]:
         """
         Evaluate all rules against telemetry data.
         
         Args:
             config: Asset twin configuration.
-            telemetry: Historical telemetry points.
+            telemetry: Historical telemetry (TelemetryBuffer or TelemetryPoint sequence).
+            cutoff_ns: Window start in epoch ns; defaults to now minus the evaluation window.
             
         Returns:
             List of RuleResult, one per rule.
         """
+        if cutoff_ns is None:
+            cutoff_ns = window_cutoff_ns(config)
+        return self._evaluate_at(config, telemetry, cutoff_ns)
+
+    def evaluate_many(
+        self,
+        configs: Sequence[TwinConfig],
+        telemetries: Sequence[Telemetry],
+        executor: Optional['Executor'] = None,
+    ) -> List[List[RuleResult]]:
+        """
+        Evaluate all rules for many assets against a single point in time.
+        
+        The clock is read once for the whole batch, so every asset is judged
+        against the same "now". The resulting window cutoff is passed to every
+        rule whose evaluate() accepts cutoff_ns; custom rules with the older
+        evaluate(config, telemetry) signature read their own clock.
+        
+        Assets are independent; pass an executor to spread them across
+        workers (worthwhile when custom rules block on I/O - the built-in
+        rules are CPU-bound and hold the GIL).
+        
+        Args:
+            configs: Asset configurations.
+            telemetries: Telemetry for each asset, aligned with configs.
+            executor: Optional executor to evaluate assets concurrently.
+            
+        Returns:
+            One list of RuleResult per asset, in input order.
+        """
+        if len(configs) != len(telemetries):
+            raise ValueError(
+                f"configs and telemetries must align, got {len(configs)} and {len(telemetries)}"
+            )
+
+        now_ns = time_ns()
+        cutoffs = [window_cutoff_ns(config, now_ns) for config in configs]
+        if executor is None:
+            return list(map(self._evaluate_at, configs, telemetries, cutoffs))
+        return list(executor.map(self._evaluate_at, configs, telemetries, cutoffs))
+
+    def _evaluate_at(
+        self,
+        config: TwinConfig,
+        telemetry: Telemetry,
+        cutoff_ns: int,
+    ) -> List[RuleResult]:
+        """Evaluate all rules for one asset with a precomputed window cutoff."""
+        buffer = as_buffer(telemetry)
+        ctx = self._prepass(config, buffer, cutoff_ns)
         results = []
-        for rule in self.rules:
-            result = rule.evaluate(config, telemetry)
+        for key, rule in self._rules.items():
+            if isinstance(rule, WindowStatsRule):
+                assert ctx is not None  # _prepass ran because this rule exists
+                result = rule.evaluate_context(ctx)
+            else:
+                result = _evaluate_rule(rule, config, buffer, cutoff_ns)
+            if result.needs_maintenance:
+                self._record_trigger(key)
             results.append(result)
         return results
 
+    def _record_trigger(self, key: str) -> None:
+        """Count a trigger (a heuristic: lost updates under threads are harmless)."""
+        counts = self._trigger_counts
+        counts[key] = counts.get(key, 0) + 1
+
+    def _prepass(
+        self,
+        config: TwinConfig,
+        telemetry: TelemetryBuffer,
+        cutoff_ns: int,
+    ) -> Optional[RuleContext]:
+        """Build the shared context for all WindowStatsRules (None if there are none)."""
+        if not any(isinstance(rule, WindowStatsRule) for rule in self._rules.values()):
+            return None
+        return build_rule_context(config, telemetry, cutoff_ns)
+
     def needs_maintenance(
         self,
         config: TwinConfig,
-        telemetry: List[TelemetryPoint],
+        telemetry: Telemetry,
     ) -> bool:
         """
         Determine if maintenance is needed based on any rule triggering.
         
-        Returns True if at least one rule indicates maintenance is needed.
+        Returns True as soon as one rule indicates maintenance is needed.
+        Rules that have triggered most often run first, then cheaper ones
+        (by relative_cost), so the common case evaluates a single rule. The
+        shared window context is only built if a WindowStatsRule is reached.
         """
-        results = self.evaluate(config, telemetry)
-        return any(r.needs_maintenance for r in results)
+        buffer = as_buffer(telemetry)
+        cutoff_ns = window_cutoff_ns(config)
+        counts = self._trigger_counts
+        ordered = sorted(
+            self._rules.items(),
+            key=lambda item: (-counts.get(item[0], 0), item[1].relative_cost),
+        )
+        ctx = None
+        for key, rule in ordered:
+            if isinstance(rule, WindowStatsRule):
+                if ctx is None:
+                    ctx = build_rule_context(config, buffer, cutoff_ns)
+                result = rule.evaluate_context(ctx)
+            else:
+                result = _evaluate_rule(rule, config, buffer, cutoff_ns)
+            if result.needs_maintenance:
+                self._record_trigger(key)
+                return True
+        return False
 
     def add_rule(self, rule: MaintenanceRule) -> None:
-        """Add a new rule to the engine."""
-        self.rules.append(rule)
+        """
+        Add a new rule to the engine.
+        
+        Raises:
+            ValueError: If a rule of the same class is already registered.
+        """
+        key = rule.__class__.__name__
+        if key in self._rules:
+            raise ValueError(f"Rule {key} is already registered")
+        self._rules[key] = rule
 
     def remove_rule(self, rule_class_name: str) -> None:
-        """Remove a rule by class name."""
-        self.rules = [r for r in self.rules if r.__class__.__name__ != rule_class_name]
+        """Remove a rule by class name (no-op if not registered)."""
+        self._rules.pop(rule_class_name, None)
+        self._trigger_counts.pop(rule_class_name, None)
 
 
 
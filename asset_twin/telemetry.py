@@ -2,12 +2,28 @@
 Telemetry data model for asset twins.
 """
 
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional
+import sys
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from math import exp, isnan
+from typing import Dict, Iterable, Iterator, Optional, Sequence
 
 
-@dataclass
+# __slots__ for high-volume records; dataclass(slots=True) requires Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NAN = float('nan')
+
+# Expired points are dropped from the arrays in batches once at least this
+# many (and at least as many as are still live) have accumulated.
+_COMPACT_MIN = 1024
+
+
+@dataclass(**_SLOTS)
 class TelemetryPoint:
     """
     Single telemetry measurement from an asset.
@@ -18,27 +34,363 @@ class TelemetryPoint:
         temperature: Temperature measurement (degrees Celsius).
         pressure: Optional pressure measurement (units depend on asset type).
         metadata: Optional additional sensor data.
+        timestamp_ns: The timestamp as epoch nanoseconds, derived once at
+                      construction (used for ordering and windowing).
     """
     timestamp: datetime
     flow: float
     temperature: float
     pressure: Optional[float] = None
     metadata: Optional[dict] = None
+    timestamp_ns: int = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        """Validate telemetry values."""
+        """Validate telemetry values and derive timestamp_ns."""
         if self.flow < 0:
             raise ValueError(f"Flow cannot be negative, got {self.flow}")
         # Temperature can be negative in some contexts, but sanity check
         if self.temperature < -100 or self.temperature > 200:
             raise ValueError(f"Temperature out of reasonable range: {self.temperature}°C")
+        self.timestamp_ns = to_epoch_ns(self.timestamp)
+
+
+def to_epoch_ns(timestamp: datetime) -> int:
+    """
+    Convert a UTC timestamp to integer nanoseconds since the Unix epoch.
+    
+    Naive datetimes are interpreted as UTC (the convention used throughout
+    this package); aware datetimes are converted exactly.
+    """
+    epoch = _EPOCH if timestamp.tzinfo is None else _EPOCH_UTC
+    delta = timestamp - epoch
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1_000
+
+
+def from_epoch_ns(timestamp_ns: int) -> datetime:
+    """Convert epoch nanoseconds back to a naive UTC datetime (microsecond resolution)."""
+    return _EPOCH + timedelta(microseconds=timestamp_ns // 1_000)
+
+
+@dataclass(**_SLOTS)
+class EwmaStats:
+    """
+    Exponentially weighted moving mean and variance of one measurement.
+    
+    Updated in O(1) per sample, so a rule can read a smoothed level
+    without rescanning the evaluation window.
+    
+    Attributes:
+        mean: Weighted mean of the samples seen so far.
+        variance: Weighted variance around the mean.
+        count: Number of samples folded in.
+    """
+    mean: float = 0.0
+    variance: float = 0.0
+    count: int = 0
+
+    def update(self, value: float, decay: float) -> None:
+        """
+        Fold in a sample.
+        
+        Args:
+            value: The new measurement.
+            decay: Weight kept by the history, in [0, 1]; 0 replaces it.
+        """
+        if self.count == 0:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            increment = (1.0 - decay) * diff
+            self.mean += increment
+            self.variance = decay * (self.variance + diff * increment)
+        self.count += 1
+
+
+class TelemetryBuffer:
+    """
+    Columnar (structure-of-arrays) telemetry store used by the rule engine.
+    
+    Each field is held in its own typed array, ordered by timestamp, so
+    selecting the evaluation window is a binary search and aggregates run
+    over contiguous machine values instead of TelemetryPoint objects.
+    
+    With a retention window, the buffer behaves as a ring buffer: points
+    older than ``latest - window_ns`` expire as newer points arrive. Expired
+    points are skipped via the ``head`` index and dropped from the arrays in
+    amortized batches, so memory and window searches scale with the
+    retention window rather than the asset's lifetime.
+    
+    Measurements are stored as float64 so that points read back (iteration,
+    AssetTwin.get_latest_telemetry()) compare equal to the points added;
+    float32 would halve the footprint but round ordinary readings such as
+    70.1 to 70.09999847.
+    
+    Attributes:
+        timestamps_ns: Measurement times as epoch nanoseconds (int64),
+            ascending once flush() has run (see append()).
+        flow: Flow measurements (float64).
+        temperature: Temperature measurements (float64).
+        pressure: Pressure measurements (float64, NaN where not measured).
+        metadata: Sparse map of array index to sensor metadata; points
+            without metadata (the common case) have no entry.
+        window_ns: Retention window in nanoseconds, or None to keep everything.
+        head: Index of the first live point; entries before it have expired.
+        ewma_tau_ns: Time constant of the EWMA trackers, or None if disabled.
+        flow_ewma: Time-weighted EWMA of flow (None unless ewma_tau_ns is set).
+        temperature_ewma: Time-weighted EWMA of temperature (None unless
+            ewma_tau_ns is set).
+    
+    The EWMA trackers weight each in-order sample by its time gap to the
+    previous one (history decays by exp(-gap / tau)), so the smoothing is
+    independent of the sampling cadence. Late arrivals are not folded in.
+    """
+
+    def __init__(self, window_ns: Optional[int] = None, ewma_tau_ns: Optional[int] = None):
+        """
+        Args:
+            window_ns: Optional retention window in nanoseconds.
+            ewma_tau_ns: Optional EWMA time constant in nanoseconds; enables
+                         flow_ewma and temperature_ewma.
+        """
+        self.timestamps_ns = array('q')
+        self.flow = array('d')
+        self.temperature = array('d')
+        self.pressure = array('d')
+        self.metadata: Dict[int, dict] = {}
+        self.window_ns = window_ns
+        self.head = 0
+        self._latest_ns = 0  # Newest timestamp seen (valid when non-empty)
+        self._dirty = False  # Late arrivals appended but not yet sorted in
+        self.ewma_tau_ns = ewma_tau_ns
+        self.flow_ewma = None if ewma_tau_ns is None else EwmaStats()
+        self.temperature_ewma = None if ewma_tau_ns is None else EwmaStats()
+
+    @classmethod
+    def from_points(
+        cls,
+        points: Iterable[TelemetryPoint],
+        window_ns: Optional[int] = None,
+    ) -> "TelemetryBuffer":
+        """Build a buffer from TelemetryPoint objects (in any order)."""
+        buffer = cls(window_ns)
+        for point in sorted(points, key=lambda t: t.timestamp_ns):
+            buffer.append_point(point)
+        return buffer
+
+    def append(
+        self,
+        timestamp_ns: int,
+        flow: float,
+        temperature: float,
+        pressure: Optional[float] = None,
+        metadata: Optional[dict] = None,
+    ) -> None:
+        """
+        Add a measurement.
+        
+        Every measurement is appended in O(1). Late arrivals leave the arrays
+        out of order until the next read (window_start, point_at, iteration
+        or flush()), which sorts them in with a single pass - so a burst of
+        out-of-order data costs one sort rather than one shift per point.
+        Values are not validated - this is the hot ingest path for trusted
+        data. Use TelemetryPoint or append_batch() for validated input.
+        """
+        timestamps = self.timestamps_ns
+        if not timestamps or timestamp_ns >= self._latest_ns:
+            if self.ewma_tau_ns is not None:
+                self._update_ewma(timestamp_ns, flow, temperature)
+            self._latest_ns = timestamp_ns
+        elif self.window_ns is not None and timestamp_ns < self._latest_ns - self.window_ns:
+            return  # Already outside the retention window
+        else:
+            self._dirty = True
+
+        timestamps.append(timestamp_ns)
+        self.flow.append(flow)
+        self.temperature.append(temperature)
+        self.pressure.append(_NAN if pressure is None else pressure)
+        if metadata is not None:
+            self.metadata[len(timestamps) - 1] = metadata
+        if self.window_ns is not None and not self._dirty:
+            self._expire(timestamp_ns - self.window_ns)
+
+    def append_batch(
+        self,
+        timestamps_ns: Sequence[int],
+        flows: Sequence[float],
+        temperatures: Sequence[float],
+        pressures: Optional[Sequence[Optional[float]]] = None,
+    ) -> None:
+        """
+        Validate and add many measurements at once.
+        
+        Applies the same range checks as TelemetryPoint, but once per batch
+        (via min/max) instead of once per point. A batch that is ordered and
+        newer than the buffer's contents is bulk-extended onto the arrays.
+        
+        Args:
+            timestamps_ns: Measurement times as epoch nanoseconds.
+            flows: Flow values aligned with timestamps_ns.
+            temperatures: Temperature values aligned with timestamps_ns.
+            pressures: Optional pressure values (None where not measured).
+            
+        Raises:
+            ValueError: If the sequences differ in length or any value is out of range.
+        """
+        count = len(timestamps_ns)
+        if (
+            len(flows) != count
+            or len(temperatures) != count
+            or (pressures is not None and len(pressures) != count)
+        ):
+            raise ValueError(
+                f"Batch columns must have equal length, got {count}, {len(flows)}, {len(temperatures)}"
+            )
+        if count == 0:
+            return
+
+        min_flow = min(flows)
+        if min_flow < 0:
+            raise ValueError(f"Flow cannot be negative, got {min_flow}")
+        min_temp = min(temperatures)
+        max_temp = max(temperatures)
+        if min_temp < -100 or max_temp > 200:
+            bad_temp = min_temp if min_temp < -100 else max_temp
+            raise ValueError(f"Temperature out of reasonable range: {bad_temp}°C")
+
+        timestamps = list(timestamps_ns)
+        in_order = timestamps == sorted(timestamps)
+        if not in_order or (self.timestamps_ns and timestamps[0] < self._latest_ns):
+            if pressures is None:
+                pressures = [None] * count
+            for row in zip(timestamps, flows, temperatures, pressures):
+                self.append(*row)
+            return
+
+        if self.ewma_tau_ns is not None:
+            for timestamp_ns, flow, temperature in zip(timestamps, flows, temperatures):
+                self._update_ewma(timestamp_ns, flow, temperature)
+                self._latest_ns = timestamp_ns
+
+        self.timestamps_ns.extend(timestamps)
+        self.flow.extend(flows)
+        self.temperature.extend(temperatures)
+        if pressures is None:
+            self.pressure.extend(array('d', [_NAN]) * count)
+        else:
+            self.pressure.extend([_NAN if p is None else p for p in pressures])
+        self._latest_ns = timestamps[-1]
+        if self.window_ns is not None and not self._dirty:
+            self._expire(timestamps[-1] - self.window_ns)
 
+    def _update_ewma(self, timestamp_ns: int, flow: float, temperature: float) -> None:
+        """Fold an in-order sample into the EWMA trackers."""
+        flow_ewma = self.flow_ewma
+        temperature_ewma = self.temperature_ewma
+        assert flow_ewma is not None and temperature_ewma is not None  # ewma_tau_ns is set
+        if flow_ewma.count == 0:
+            decay = 0.0
+        else:
+            decay = exp((self._latest_ns - timestamp_ns) / self.ewma_tau_ns)
+        flow_ewma.update(flow, decay)
+        temperature_ewma.update(temperature, decay)
 
+    def append_point(self, point: TelemetryPoint) -> None:
+        """Add an already-validated TelemetryPoint."""
+        self.append(
+            point.timestamp_ns,
+            point.flow,
+            point.temperature,
+            point.pressure,
+            point.metadata,
+        )
 
+    def _expire(self, expiry_ns: int) -> None:
+        """Advance head past points older than expiry_ns, compacting when worthwhile."""
+        timestamps = self.timestamps_ns
+        head = self.head
+        while timestamps[head] < expiry_ns:
+            head += 1
+        self.head = head
 
+        if head >= _COMPACT_MIN and head >= len(timestamps) - head:
+            del timestamps[:head]
+            del self.flow[:head]
+            del self.temperature[:head]
+            del self.pressure[:head]
+            if self.metadata:
+                self.metadata = {
+                    index - head: metadata
+                    for index, metadata in self.metadata.items()
+                    if index >= head
+                }
+            self.head = 0
 
+    def flush(self) -> None:
+        """
+        Sort pending late arrivals into place.
+        
+        Called by every reader; call it directly before reading the arrays
+        yourself. Equal timestamps keep their arrival order. Expired points
+        are dropped as part of the rebuild.
+        """
+        if not self._dirty:
+            return
+        timestamps = self.timestamps_ns
+        head = self.head
+        # Timsort finds the sorted prefix and the late tail as runs
+        order = sorted(range(head, len(timestamps)), key=timestamps.__getitem__)
+        for column in (timestamps, self.flow, self.temperature, self.pressure):
+            column[:] = array(column.typecode, [column[index] for index in order])
+        if self.metadata:
+            position = {old: new for new, old in enumerate(order)}
+            self.metadata = {
+                position[index]: metadata
+                for index, metadata in self.metadata.items()
+                if index >= head
+            }
+        self.head = 0
+        self._dirty = False
+        if self.window_ns is not None:
+            self._expire(self._latest_ns - self.window_ns)
 
+    def window_start(self, cutoff_ns: int) -> int:
+        """Return the index of the first live measurement at or after cutoff_ns."""
+        self.flush()
+        return bisect_left(self.timestamps_ns, cutoff_ns, self.head)
 
+    def point_at(self, index: int) -> TelemetryPoint:
+        """Materialize the measurement at index as a TelemetryPoint."""
+        self.flush()
+        pressure = self.pressure[index]
+        return TelemetryPoint(
+            timestamp=from_epoch_ns(self.timestamps_ns[index]),
+            flow=self.flow[index],
+            temperature=self.temperature[index],
+            pressure=None if isnan(pressure) else pressure,
+            metadata=self.metadata.get(index),
+        )
 
+    def clear(self) -> None:
+        """Remove all measurements."""
+        del self.timestamps_ns[:]
+        del self.flow[:]
+        del self.temperature[:]
+        del self.pressure[:]
+        self.metadata.clear()
+        self.head = 0
+        self._dirty = False
+        if self.ewma_tau_ns is not None:
+            self.flow_ewma = EwmaStats()
+            self.temperature_ewma = EwmaStats()
 
+    def __len__(self) -> int:
+        """Return the number of live (unexpired) measurements."""
+        self.flush()
+        return len(self.timestamps_ns) - self.head
 
+    def __iter__(self) -> Iterator[TelemetryPoint]:
+        """Iterate live points as TelemetryPoint objects (for rules written against point lists)."""
+        self.flush()
+        for index in range(self.head, len(self.timestamps_ns)):
+            yield self.point_at(index)
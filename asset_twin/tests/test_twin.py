@@ -2,6 +2,11 @@
 Unit tests for asset twin digital twin library.
 """
 
+import math
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from datetime import datetime, timedelta
 
@@ -10,13 +15,25 @@ from asset_twin import (
     TwinConfig,
     MaintenanceThresholds,
     TelemetryPoint,
+    TelemetryBuffer,
+    BucketDetector,
     RuleEngine,
+    MaintenanceRule,
+    RuleResult,
+)
+from asset_twin import rules as rules_module
+from asset_twin.rules import (
+    FastFlowDegradationRule,
+    FlowDegradationRule,
+    TemperatureExcursionRule,
+    WindowStatsRule,
 )
-from asset_twin.rules import FlowDegradationRule, TemperatureExcursionRule
+from asset_twin.telemetry import from_epoch_ns, to_epoch_ns
 
 
 # Fixtures
-@pytest.fixture
+# Read-only fixtures: built once per session. Tests must not mutate them.
+@pytest.fixture(scope="session")
 def basic_config():
     """Standard asset configuration for testing."""
     return TwinConfig(
@@ -34,7 +51,7 @@ def basic_config():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_telemetry():
     """Generate sample normal telemetry over 7 days."""
     points = []
@@ -72,6 +89,27 @@ class TestTelemetryPoint:
                 temperature=70.0,
             )
 
+    def test_timestamp_ns_derived(self):
+        """timestamp_ns should be derived at construction and excluded from equality."""
+        ts = datetime(2024, 1, 1, 12, 0, 0, 250)
+        point = TelemetryPoint(timestamp=ts, flow=85.0, temperature=65.0)
+        assert point.timestamp_ns == to_epoch_ns(ts)
+        assert "timestamp_ns" not in repr(point)
+
+        other = TelemetryPoint(timestamp=ts, flow=85.0, temperature=65.0)
+        other.timestamp_ns += 1
+        assert other == point
+
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots require Python 3.10+")
+    def test_slotted_no_instance_dict(self):
+        """TelemetryPoint should use __slots__ rather than a per-instance __dict__."""
+        point = TelemetryPoint(
+            timestamp=datetime.utcnow(),
+            flow=50.0,
+            temperature=70.0,
+        )
+        assert not hasattr(point, "__dict__")
+
     def test_extreme_temperature_rejected(self):
         """Unreasonable temperature should raise ValueError."""
         with pytest.raises(ValueError, match="Temperature out of reasonable range"):
@@ -82,6 +120,187 @@ class TestTelemetryPoint:
             )
 
 
+# Test TelemetryBuffer
+class TestTelemetryBuffer:
+    def test_epoch_ns_round_trip(self):
+        """Naive UTC timestamps should survive conversion to epoch ns and back."""
+        ts = datetime(2024, 3, 1, 12, 30, 15, 123456)
+        assert to_epoch_ns(datetime(1970, 1, 1, 0, 0, 1)) == 1_000_000_000
+        assert from_epoch_ns(to_epoch_ns(ts)) == ts
+
+    def test_out_of_order_append_kept_sorted(self):
+        """Late measurements should be sorted into place on flush."""
+        buffer = TelemetryBuffer()
+        buffer.append(300, 90.0, 70.0)
+        buffer.append(100, 85.0, 65.0)
+        buffer.append(200, 88.0, 68.0)
+        buffer.flush()
+        assert list(buffer.timestamps_ns) == [100, 200, 300]
+        assert list(buffer.flow) == [85.0, 88.0, 90.0]
+        assert list(buffer.temperature) == [65.0, 68.0, 70.0]
+
+    def test_late_arrivals_sorted_lazily(self):
+        """Late arrivals should be appended and only sorted when read."""
+        buffer = TelemetryBuffer(window_ns=1000)
+        for ts in (400, 100, 300, 200, 300):
+            buffer.append(ts, float(ts), 70.0)
+        assert list(buffer.timestamps_ns) == [400, 100, 300, 200, 300]
+        
+        assert buffer.window_start(250) == 2
+        assert list(buffer.timestamps_ns) == [100, 200, 300, 300, 400]
+        
+        # Reads expire points that fell out of the window while unsorted
+        buffer.append(1250, 0.0, 70.0)
+        assert [p.flow for p in buffer] == [300.0, 300.0, 400.0, 0.0]
+
+    def test_measurements_round_trip_exactly(self):
+        """Values not representable in float32 should come back unchanged."""
+        buffer = TelemetryBuffer()
+        buffer.append(0, 70.1, 65.3, 1.1)
+        assert (buffer.flow[0], buffer.temperature[0], buffer.pressure[0]) == (70.1, 65.3, 1.1)
+
+    def test_append_batch(self):
+        """A validated batch should be stored like individual appends."""
+        buffer = TelemetryBuffer()
+        buffer.append(50, 80.0, 60.0)
+        buffer.append_batch([100, 200, 300], [85.0, 88.0, 90.0], [65.0, 68.0, 70.0])
+        assert list(buffer.timestamps_ns) == [50, 100, 200, 300]
+        assert list(buffer.flow) == [80.0, 85.0, 88.0, 90.0]
+        assert all(p.pressure is None for p in buffer)
+
+    def test_append_batch_out_of_order(self):
+        """Unordered batches should still leave the buffer sorted."""
+        buffer = TelemetryBuffer()
+        buffer.append(250, 89.0, 69.0)
+        buffer.append_batch([300, 100, 200], [90.0, 85.0, 88.0], [70.0, 65.0, 68.0])
+        buffer.flush()
+        assert list(buffer.timestamps_ns) == [100, 200, 250, 300]
+        assert list(buffer.flow) == [85.0, 88.0, 89.0, 90.0]
+
+    @pytest.mark.parametrize("flows,temps,match", [
+        ([85.0, -1.0], [65.0, 66.0], "Flow cannot be negative"),
+        ([85.0, 86.0], [65.0, 500.0], "Temperature out of reasonable range"),
+        ([85.0], [65.0, 66.0], "equal length"),
+    ], ids=["negative_flow", "hot", "ragged"])
+    def test_append_batch_rejects_invalid(self, flows, temps, match):
+        """Invalid batches should raise ValueError and leave the buffer unchanged."""
+        buffer = TelemetryBuffer()
+        with pytest.raises(ValueError, match=match):
+            buffer.append_batch([100, 200], flows, temps)
+        assert len(buffer) == 0
+
+    def test_from_points_round_trip(self, sample_telemetry):
+        """Iterating a buffer should yield the original points."""
+        buffer = TelemetryBuffer.from_points(reversed(sample_telemetry))
+        assert len(buffer) == len(sample_telemetry)
+        assert list(buffer) == sample_telemetry
+
+    def test_retention_window_expires_old_points(self):
+        """Points older than latest - window_ns should no longer be live."""
+        buffer = TelemetryBuffer(window_ns=100)
+        for ts in (0, 50, 100, 150, 200):
+            buffer.append(ts, float(ts), 70.0)
+        assert len(buffer) == 3
+        assert [p.flow for p in buffer] == [100.0, 150.0, 200.0]
+
+        # Late arrivals already outside the window are dropped
+        buffer.append(10, 90.0, 70.0)
+        assert len(buffer) == 3
+
+    def test_retention_window_compacts_arrays(self):
+        """Expired points should eventually be dropped from the arrays."""
+        buffer = TelemetryBuffer(window_ns=10)
+        for ts in range(5000):
+            buffer.append(ts, 90.0, 70.0)
+        assert len(buffer) == 11
+        assert len(buffer.timestamps_ns) < 2100
+        assert buffer.timestamps_ns[buffer.head] == 4989
+
+    def test_metadata_stored_sparsely(self):
+        """Only points with metadata get a sidecar entry, re-keyed on late inserts."""
+        buffer = TelemetryBuffer()
+        buffer.append(100, 90.0, 70.0)
+        buffer.append(300, 90.0, 70.0, metadata={"sensor": "b"})
+        buffer.append(200, 90.0, 70.0, metadata={"sensor": "a"})
+        buffer.flush()
+        assert buffer.metadata == {1: {"sensor": "a"}, 2: {"sensor": "b"}}
+        assert [p.metadata for p in buffer] == [None, {"sensor": "a"}, {"sensor": "b"}]
+
+    def test_metadata_survives_compaction(self):
+        """Compaction should drop expired metadata and shift the rest."""
+        buffer = TelemetryBuffer(window_ns=10)
+        for ts in range(5000):
+            buffer.append(ts, 90.0, 70.0, metadata={"ts": ts} if ts % 1000 == 0 else None)
+        live = list(buffer)
+        assert [p.metadata for p in live if p.metadata] == []
+        buffer.append(5000, 90.0, 70.0, metadata={"ts": 5000})
+        assert list(buffer)[-1].metadata == {"ts": 5000}
+        assert all(index >= buffer.head for index in buffer.metadata)
+
+    def test_ewma_tracking(self):
+        """EWMA trackers should follow in-order samples and ignore late ones."""
+        buffer = TelemetryBuffer(ewma_tau_ns=100)
+        buffer.append(0, 90.0, 70.0)
+        assert buffer.flow_ewma.mean == 90.0
+        
+        buffer.append(100, 80.0, 70.0)
+        decay = math.exp(-1)
+        assert buffer.flow_ewma.mean == pytest.approx(90.0 - (1 - decay) * 10.0)
+        assert buffer.flow_ewma.variance == pytest.approx(decay * (1 - decay) * 100.0)
+        assert buffer.temperature_ewma.mean == 70.0
+        
+        mean = buffer.flow_ewma.mean
+        buffer.append(50, 0.0, 70.0)
+        assert buffer.flow_ewma.mean == mean
+        assert buffer.flow_ewma.count == 2
+
+    def test_ewma_disabled_by_default(self):
+        """Buffers without ewma_tau_ns should not track an EWMA."""
+        assert TelemetryBuffer().flow_ewma is None
+
+    def test_window_start(self):
+        """window_start should return the first index at or after the cutoff."""
+        buffer = TelemetryBuffer()
+        for ts in (100, 200, 300):
+            buffer.append(ts, 90.0, 70.0)
+        assert buffer.window_start(0) == 0
+        assert buffer.window_start(200) == 1
+        assert buffer.window_start(301) == 3
+
+
+class TestBucketDetector:
+    def test_sustained_degradation_climbs_buckets(self):
+        """Consistently low samples should overflow every bucket."""
+        detector = BucketDetector(mean=100.0, sigma=5.0, buckets=5, depth=10)
+        for _ in range(5 * 11 - 1):
+            detector.update(70.0)
+        assert not detector.degraded
+        detector.update(70.0)
+        assert detector.degraded
+
+    def test_isolated_dips_do_not_alarm(self):
+        """Good samples should drain the bucket and step back down."""
+        detector = BucketDetector(mean=100.0, sigma=5.0, buckets=2, depth=3)
+        for i in range(200):
+            detector.update(70.0 if i % 2 else 99.0)
+        assert not detector.degraded
+        assert detector.bucket <= 2
+
+    def test_reset(self):
+        """reset() should return to the first empty bucket."""
+        detector = BucketDetector(mean=100.0, sigma=5.0, buckets=1, depth=1)
+        for _ in range(3):
+            detector.update(50.0)
+        assert detector.degraded
+        detector.reset()
+        assert (detector.bucket, detector.level) == (1, 0)
+
+    def test_invalid_sigma_rejected(self):
+        """sigma must be positive."""
+        with pytest.raises(ValueError, match="sigma must be > 0"):
+            BucketDetector(mean=100.0, sigma=0.0)
+
+
 # Test Configuration
 class TestTwinConfig:
     def test_default_thresholds_created(self):
@@ -147,6 +366,13 @@ class TestAssetTwin:
         assert twin.asset_id == "PUMP-001"
         assert twin.get_telemetry_count() == 0
 
+    def test_slotted_no_instance_dict(self, basic_config):
+        """AssetTwin should use __slots__ instead of a per-instance dict."""
+        twin = AssetTwin(basic_config)
+        assert not hasattr(twin, "__dict__")
+        with pytest.raises(AttributeError):
+            twin.extra = 1
+
     def test_add_telemetry_point(self, basic_config):
         """Should add telemetry point."""
         twin = AssetTwin(basic_config)
@@ -171,6 +397,34 @@ class TestAssetTwin:
         assert latest is not None
         assert latest.flow == 85.0
 
+    def test_add_telemetry_batch(self, basic_config, sample_telemetry):
+        """A batch should be stored exactly like individual points."""
+        twin = AssetTwin(basic_config)
+        twin.add_telemetry_batch(
+            [p.timestamp for p in sample_telemetry],
+            [p.flow for p in sample_telemetry],
+            [p.temperature for p in sample_telemetry],
+        )
+        
+        assert twin.telemetry == sample_telemetry
+        assert not twin.needs_maintenance()
+
+    def test_add_telemetry_batch_with_pressure(self, basic_config):
+        """Optional pressures should be stored, with None where not measured."""
+        twin = AssetTwin(basic_config)
+        now = datetime.utcnow()
+        twin.add_telemetry_batch([now, now + timedelta(hours=1)], [90.0, 91.0], [70.0, 70.0], [2.5, None])
+        
+        assert [p.pressure for p in twin.telemetry] == [2.5, None]
+
+    def test_add_telemetry_batch_rejects_invalid(self, basic_config):
+        """An invalid reading should reject the whole batch."""
+        twin = AssetTwin(basic_config)
+        now = datetime.utcnow()
+        with pytest.raises(ValueError, match="Flow cannot be negative"):
+            twin.add_telemetry_batch([now, now], [90.0, -1.0], [70.0, 70.0])
+        assert twin.get_telemetry_count() == 0
+
     def test_telemetry_sorted_by_timestamp(self, basic_config):
         """Telemetry should be kept sorted by timestamp."""
         twin = AssetTwin(basic_config)
@@ -186,6 +440,41 @@ class TestAssetTwin:
         assert twin.telemetry[1].flow == 88.0
         assert twin.telemetry[2].flow == 90.0
 
+    def test_telemetry_stored_column_wise(self, basic_config, sample_telemetry):
+        """The twin should keep telemetry in its buffer, not as point objects."""
+        twin = AssetTwin(basic_config)
+        for point in reversed(sample_telemetry):
+            twin.add_telemetry(point)
+        
+        assert isinstance(twin.buffer, TelemetryBuffer)
+        assert list(twin.buffer.flow) == [p.flow for p in sample_telemetry]
+        assert twin.telemetry == sample_telemetry
+
+    def test_old_telemetry_pruned_beyond_retention(self, basic_config):
+        """Points older than two evaluation windows behind the newest should be dropped."""
+        twin = AssetTwin(basic_config)
+        now = datetime.utcnow()
+        
+        twin.add_telemetry_reading(now - timedelta(days=30), 90.0, 70.0)
+        twin.add_telemetry_reading(now - timedelta(days=10), 91.0, 70.0)
+        twin.add_telemetry_reading(now, 92.0, 70.0)
+        
+        assert twin.get_telemetry_count() == 2
+        assert [p.flow for p in twin.telemetry] == [91.0, 92.0]
+
+    def test_late_arrival_inserted_in_order(self, basic_config, sample_telemetry):
+        """Late points should land at their sorted position, after equal timestamps."""
+        twin = AssetTwin(basic_config)
+        for point in sample_telemetry:
+            twin.add_telemetry(point)
+        
+        late = TelemetryPoint(timestamp=sample_telemetry[10].timestamp, flow=50.0, temperature=60.0)
+        twin.add_telemetry(late)
+        
+        assert twin.telemetry[11].flow == 50.0
+        timestamps = [p.timestamp for p in twin.telemetry]
+        assert timestamps == sorted(timestamps)
+
     def test_get_latest_telemetry(self, basic_config, sample_telemetry):
         """Should return most recent telemetry point."""
         twin = AssetTwin(basic_config)
@@ -195,6 +484,15 @@ class TestAssetTwin:
         latest = twin.get_latest_telemetry()
         assert latest == sample_telemetry[-1]
 
+    def test_get_latest_telemetry_round_trips_values(self, basic_config):
+        """Readings like 70.1 should come back equal, not storage-rounded."""
+        twin = AssetTwin(basic_config)
+        point = TelemetryPoint(timestamp=datetime.utcnow(), flow=70.1, temperature=65.3, pressure=1.1)
+        twin.add_telemetry(point)
+
+        assert twin.get_latest_telemetry() == point
+        assert twin.telemetry == [point]
+
     def test_get_latest_telemetry_empty(self, basic_config):
         """Should return None when no telemetry."""
         twin = AssetTwin(basic_config)
@@ -211,109 +509,94 @@ class TestAssetTwin:
 
 
 # Test Rules
-class TestFlowDegradationRule:
-    def test_normal_flow_no_maintenance(self, basic_config):
-        """Normal flow should not trigger maintenance."""
-        rule = FlowDegradationRule()
-        
-        # Generate normal telemetry: 95-99 L/min (rated: 100, threshold: 80)
-        telemetry = []
-        base_time = datetime.utcnow() - timedelta(days=5)
-        for i in range(30):
-            telemetry.append(
-                TelemetryPoint(
-                    timestamp=base_time + timedelta(hours=i * 4),
-                    flow=95.0 + (i % 5),
-                    temperature=70.0,
-                )
-            )
-        
-        result = rule.evaluate(basic_config, telemetry)
-        assert not result.needs_maintenance
+def _make_telemetry(flow_fn, temp_fn, n=30, days_back=5, step_hours=4):
+    """Build n points spaced step_hours apart, starting days_back days ago."""
+    base_time = datetime.utcnow() - timedelta(days=days_back)
+    return [
+        TelemetryPoint(
+            timestamp=base_time + timedelta(hours=i * step_hours),
+            flow=flow_fn(i),
+            temperature=temp_fn(i),
+        )
+        for i in range(n)
+    ]
+
+
+class TestRuleThresholds:
+    @pytest.mark.parametrize("rule_cls,flow_fn,temp_fn,expected,substr,check", [
+        # Normal flow: 95-99 L/min (rated: 100, threshold: 80)
+        (FlowDegradationRule, lambda i: 95.0 + (i % 5), lambda i: 70.0, False, None, None),
+        # Degraded flow: 70-74 L/min (below 80% of 100)
+        (FlowDegradationRule, lambda i: 70.0 + (i % 5), lambda i: 70.0, True,
+         "Flow degradation", lambda tv: tv["avg_flow"] < 80.0),
+        # Temperature 65-69°C (failure: 85, threshold: 80)
+        (TemperatureExcursionRule, lambda i: 95.0, lambda i: 65.0 + (i % 5), False, None, None),
+        # Temperature spiking to 82°C (above threshold of 80)
+        (TemperatureExcursionRule, lambda i: 95.0, lambda i: 75.0 + (i % 8), True,
+         "Temperature excursion", lambda tv: tv["max_temperature"] > 80.0),
+    ], ids=["flow_normal", "flow_degraded", "temperature_normal", "temperature_high"])
+    def test_rule_thresholds(self, basic_config, rule_cls, flow_fn, temp_fn, expected, substr, check):
+        """Rules should trigger only when the window crosses their threshold."""
+        result = rule_cls().evaluate(basic_config, _make_telemetry(flow_fn, temp_fn))
+        assert result.needs_maintenance == expected
+        if expected:
+            assert substr in result.reason
+            assert result.triggered_values is not None
+            assert check(result.triggered_values)
 
-    def test_degraded_flow_triggers_maintenance(self, basic_config):
-        """Flow below threshold should trigger maintenance."""
-        rule = FlowDegradationRule()
-        
-        # Generate degraded flow: 70-75 L/min (below 80% of 100)
-        telemetry = []
-        base_time = datetime.utcnow() - timedelta(days=5)
-        for i in range(30):
-            telemetry.append(
-                TelemetryPoint(
-                    timestamp=base_time + timedelta(hours=i * 4),
-                    flow=70.0 + (i % 5),
-                    temperature=70.0,
-                )
-            )
-        
-        result = rule.evaluate(basic_config, telemetry)
-        assert result.needs_maintenance
-        assert "Flow degradation" in result.reason
-        assert result.triggered_values is not None
-        assert result.triggered_values["avg_flow"] < 80.0
 
+class TestFlowDegradationRule:
     def test_insufficient_data(self, basic_config):
         """Too few data points should not trigger maintenance."""
         rule = FlowDegradationRule()
         
-        # Only 10 points (need 20)
-        telemetry = []
-        base_time = datetime.utcnow() - timedelta(days=2)
-        for i in range(10):
-            telemetry.append(
-                TelemetryPoint(
-                    timestamp=base_time + timedelta(hours=i * 4),
-                    flow=50.0,  # Very low, but not enough data
-                    temperature=70.0,
-                )
-            )
+        # Only 10 points (need 20); very low flow, but not enough data
+        telemetry = _make_telemetry(lambda i: 50.0, lambda i: 70.0, n=10, days_back=2)
         
         result = rule.evaluate(basic_config, telemetry)
         assert not result.needs_maintenance
         assert "Insufficient data" in result.reason
 
-
-class TestTemperatureExcursionRule:
-    def test_normal_temperature_no_maintenance(self, basic_config):
-        """Normal temperature should not trigger maintenance."""
-        rule = TemperatureExcursionRule()
-        
-        # Temperature 65-70°C (failure: 85, threshold: 80)
-        telemetry = []
-        base_time = datetime.utcnow() - timedelta(days=5)
-        for i in range(30):
-            telemetry.append(
-                TelemetryPoint(
-                    timestamp=base_time + timedelta(hours=i * 4),
-                    flow=95.0,
-                    temperature=65.0 + (i % 5),
-                )
-            )
-        
-        result = rule.evaluate(basic_config, telemetry)
+    def test_explicit_cutoff_limits_window(self, basic_config, sample_telemetry):
+        """A cutoff after the last point should leave an empty window."""
+        rule = FlowDegradationRule()
+        cutoff_ns = to_epoch_ns(datetime.utcnow() + timedelta(days=1))
+        result = rule.evaluate(basic_config, sample_telemetry, cutoff_ns=cutoff_ns)
         assert not result.needs_maintenance
-
-    def test_high_temperature_triggers_maintenance(self, basic_config):
-        """Temperature above threshold should trigger maintenance."""
-        rule = TemperatureExcursionRule()
-        
-        # Temperature spiking to 82°C (above threshold of 80)
-        telemetry = []
-        base_time = datetime.utcnow() - timedelta(days=5)
-        for i in range(30):
-            telemetry.append(
-                TelemetryPoint(
-                    timestamp=base_time + timedelta(hours=i * 4),
-                    flow=95.0,
-                    temperature=75.0 + (i % 8),  # Goes up to 82
-                )
-            )
+        assert "Insufficient data: 0 points" in result.reason
+
+    def test_default_cutoff_uses_epoch_clock(self, basic_config):
+        """The default window cutoff should be now (UTC epoch ns) minus the window."""
+        before = time.time_ns()
+        cutoff_ns = rules_module.window_cutoff_ns(basic_config)
+        after = time.time_ns()
+        window_ns = 7 * 86_400 * 1_000_000_000
+        assert before - window_ns <= cutoff_ns <= after - window_ns
+        assert abs(cutoff_ns - to_epoch_ns(datetime.utcnow() - timedelta(days=7))) < 1_000_000_000
+
+
+class TestFastFlowDegradationRule:
+    @pytest.mark.parametrize("flow_fn,expected", [
+        (lambda i: 95.0 + (i % 5), False),
+        (lambda i: 70.0 + (i % 5), True),
+    ], ids=["normal", "degraded"])
+    def test_ewma_threshold(self, basic_config, flow_fn, expected):
+        """The EWMA rule should agree with the windowed rule on steady series."""
+        twin = AssetTwin(basic_config)
+        for point in _make_telemetry(flow_fn, lambda i: 70.0):
+            twin.add_telemetry(point)
         
-        result = rule.evaluate(basic_config, telemetry)
-        assert result.needs_maintenance
-        assert "Temperature excursion" in result.reason
-        assert result.triggered_values["max_temperature"] > 80.0
+        result = FastFlowDegradationRule().evaluate(basic_config, twin.buffer)
+        assert result.needs_maintenance == expected
+        assert 0.0 < result.confidence <= 1.0
+        if expected:
+            assert result.triggered_values["ewma_flow"] < 80.0
+
+    def test_requires_ewma_tracking(self, basic_config, sample_telemetry):
+        """Plain point lists carry no EWMA state."""
+        result = FastFlowDegradationRule().evaluate(basic_config, sample_telemetry)
+        assert not result.needs_maintenance
+        assert result.confidence == 0.0
 
 
 # Test RuleEngine
@@ -344,6 +627,23 @@ class TestRuleEngine:
         rule_names = [r.__class__.__name__ for r in engine.rules]
         assert "FlowDegradationRule" not in rule_names
 
+    def test_duplicate_rule_rejected(self):
+        """Only one rule per class may be registered."""
+        engine = RuleEngine()
+        with pytest.raises(ValueError, match="already registered"):
+            engine.add_rule(FlowDegradationRule())
+        with pytest.raises(ValueError, match="already registered"):
+            RuleEngine(rules=[FlowDegradationRule(), FlowDegradationRule()])
+
+    def test_rules_keep_registration_order(self):
+        """Rules should be listed in the order they were added."""
+        engine = RuleEngine(rules=[TemperatureExcursionRule()])
+        engine.add_rule(FlowDegradationRule())
+        assert [r.name for r in engine.rules] == ["TemperatureExcursionRule", "FlowDegradationRule"]
+        assert engine.rule_names == ["TemperatureExcursionRule", "FlowDegradationRule"]
+        engine.remove_rule("NoSuchRule")
+        assert len(engine.rules) == 2
+
     def test_needs_maintenance_any_rule_triggers(self, basic_config):
         """Should return True if any rule indicates maintenance needed."""
         engine = RuleEngine()
@@ -362,12 +662,125 @@ class TestRuleEngine:
         
         assert engine.needs_maintenance(basic_config, telemetry)
 
+    def test_needs_maintenance_short_circuits_on_frequent_trigger(self, basic_config, sample_telemetry):
+        """Rules that triggered before should run first, skipping the rest."""
+        calls = []
+
+        class QuietRule(MaintenanceRule):
+            def evaluate(self, config, telemetry, cutoff_ns=None):
+                calls.append(self.name)
+                return RuleResult(needs_maintenance=False, reason="quiet")
+
+        class AlarmRule(MaintenanceRule):
+            def evaluate(self, config, telemetry, cutoff_ns=None):
+                calls.append(self.name)
+                return RuleResult(needs_maintenance=True, reason="alarm")
+
+        engine = RuleEngine(rules=[QuietRule(), AlarmRule()])
+        assert engine.needs_maintenance(basic_config, sample_telemetry)
+        assert calls == ["QuietRule", "AlarmRule"]
+        
+        calls.clear()
+        assert engine.needs_maintenance(basic_config, sample_telemetry)
+        assert calls == ["AlarmRule"]
+
     def test_evaluate_returns_all_results(self, basic_config, sample_telemetry):
         """Evaluate should return result for each rule."""
         engine = RuleEngine()
         results = engine.evaluate(basic_config, sample_telemetry)
         assert len(results) == 2
 
+    def test_evaluate_many_matches_evaluate(self, basic_config, sample_telemetry):
+        """Batch evaluation should give the same results as per-asset evaluation."""
+        engine = RuleEngine()
+        degraded = [
+            TelemetryPoint(timestamp=p.timestamp, flow=60.0, temperature=p.temperature)
+            for p in sample_telemetry
+        ]
+        batch = engine.evaluate_many([basic_config, basic_config], [sample_telemetry, degraded])
+        assert batch == [
+            engine.evaluate(basic_config, sample_telemetry),
+            engine.evaluate(basic_config, degraded),
+        ]
+
+    def test_evaluate_many_with_executor(self, basic_config, sample_telemetry):
+        """An executor should be usable to spread assets across workers."""
+        engine = RuleEngine()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            batch = engine.evaluate_many(
+                [basic_config] * 3, [sample_telemetry] * 3, executor=executor
+            )
+        assert len(batch) == 3
+        assert all(len(results) == 2 for results in batch)
+
+    def test_evaluate_many_shares_cutoff_with_custom_rules(self, basic_config, sample_telemetry):
+        """Custom rules taking cutoff_ns should all get the batch's single cutoff."""
+        seen = []
+
+        class CutoffRule(MaintenanceRule):
+            def evaluate(self, config, telemetry, cutoff_ns=None):
+                seen.append(cutoff_ns)
+                return RuleResult(needs_maintenance=False, reason="recorded")
+
+        RuleEngine(rules=[CutoffRule()]).evaluate_many(
+            [basic_config] * 3, [sample_telemetry] * 3
+        )
+        assert len(seen) == 3 and len(set(seen)) == 1 and seen[0] is not None
+
+    def test_evaluate_many_length_mismatch(self, basic_config):
+        """Misaligned inputs should raise ValueError."""
+        with pytest.raises(ValueError, match="must align"):
+            RuleEngine().evaluate_many([basic_config], [])
+
+    def test_window_scanned_once_for_builtin_rules(self, basic_config, sample_telemetry, monkeypatch):
+        """Built-in rules should share a single pass over the telemetry window."""
+        calls = []
+        original = rules_module.window_stats
+
+        def counting_window_stats(*args):
+            calls.append(args)
+            return original(*args)
+
+        monkeypatch.setattr(rules_module, "window_stats", counting_window_stats)
+        RuleEngine().evaluate(basic_config, sample_telemetry)
+        assert len(calls) == 1
+
+    def test_window_average_exactly_rounded(self):
+        """The window mean should not lose small values to cancellation."""
+        count, avg_flow, _ = rules_module.window_stats(
+            [1, 2, 3], [1e16, 3.0, -1e16], [70.0, 70.0, 70.0], 0, 1
+        )
+        assert count == 3
+        assert avg_flow == 1.0
+
+    def test_rules_share_one_context(self, basic_config, sample_telemetry):
+        """WindowStatsRules should all receive the same precomputed RuleContext."""
+        seen = []
+
+        class RecordingRule(WindowStatsRule):
+            def evaluate_context(self, ctx):
+                seen.append(ctx)
+                return RuleResult(needs_maintenance=False, reason="recorded")
+
+        class OtherRecordingRule(RecordingRule):
+            pass
+
+        RuleEngine(rules=[RecordingRule(), OtherRecordingRule()]).evaluate(basic_config, sample_telemetry)
+        assert len(seen) == 2 and seen[0] is seen[1]
+        assert seen[0].flow_threshold == 80.0
+        assert seen[0].temperature_threshold == 80.0
+
+    def test_custom_rule_receives_raw_telemetry(self, basic_config, sample_telemetry):
+        """Rules that are not WindowStatsRule should still get the telemetry itself."""
+
+        class CountingRule(MaintenanceRule):
+            def evaluate(self, config, telemetry):
+                return RuleResult(needs_maintenance=False, reason=f"{len(list(telemetry))} points")
+
+        engine = RuleEngine(rules=[FlowDegradationRule(), CountingRule()])
+        results = engine.evaluate(basic_config, sample_telemetry)
+        assert results[1].reason == f"{len(sample_telemetry)} points"
+
 
 # Integration Tests
 class TestAssetTwinIntegration:
@@ -436,6 +849,44 @@ class TestAssetTwinIntegration:
         
         assert not twin.needs_maintenance()
 
+    def test_assessment_cached_until_telemetry_changes(self, basic_config, sample_telemetry, monkeypatch):
+        """Repeated assessments should reuse the cached result until telemetry changes."""
+        twin = AssetTwin(basic_config)
+        for point in sample_telemetry:
+            twin.add_telemetry(point)
+        
+        calls = []
+        original = twin.rule_engine.evaluate
+        def counting_evaluate(*args, **kwargs):
+            calls.append(1)
+            return original(*args, **kwargs)
+        monkeypatch.setattr(twin.rule_engine, "evaluate", counting_evaluate)
+        
+        first = twin.get_maintenance_assessment()
+        assert not twin.needs_maintenance()
+        assert twin.get_maintenance_assessment() == first
+        assert len(calls) == 1
+        
+        twin.add_telemetry_reading(datetime.utcnow(), 50.0, 65.0)
+        twin.get_maintenance_assessment()
+        assert len(calls) == 2
+        
+        twin.rule_engine.remove_rule("TemperatureExcursionRule")
+        assert len(twin.get_maintenance_assessment()) == 1
+        assert len(calls) == 3
+
+    @pytest.mark.parametrize("flow,expected", [(97.0, False), (70.0, True)], ids=["normal", "degraded"])
+    def test_flow_degradation_sustained(self, basic_config, flow, expected):
+        """The bucket detector should flag only sustained low flow."""
+        twin = AssetTwin(basic_config)
+        base_time = datetime.utcnow() - timedelta(days=5)
+        for i in range(60):
+            twin.add_telemetry_reading(base_time + timedelta(hours=i * 2), flow, 65.0)
+        
+        assert twin.flow_degradation_sustained() == expected
+        twin.clear_telemetry()
+        assert not twin.flow_degradation_sustained()
+
     def test_repr(self, basic_config):
         """Twin repr should contain key info."""
         twin = AssetTwin(basic_config)
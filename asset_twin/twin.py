@@ -27,16 +27,27 @@ Classes:
 
 Related Modules:
     config: TwinConfig dataclass for asset parameters and thresholds
-    telemetry: TelemetryPoint dataclass for sensor readings
+    telemetry: TelemetryPoint readings and the columnar TelemetryBuffer store
     rules: RuleEngine and built-in MaintenanceRule implementations
 """
 
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
 
 from .config import TwinConfig
-from .telemetry import TelemetryPoint
-from .rules import RuleEngine, RuleResult
+from .detectors import BucketDetector
+from .telemetry import TelemetryBuffer, TelemetryPoint, to_epoch_ns
+from .rules import _NS_PER_DAY, RuleEngine, RuleResult, window_cutoff_ns
+
+# Telemetry is retained for this many evaluation windows behind the newest
+# point; rules never look further back, so older data is dropped on insert.
+_RETENTION_WINDOWS = 2
+
+# Flow bucket detector: expected spread as a fraction of rated flow, and
+# bucket count/depth (see BucketDetector)
+_FLOW_SIGMA_RATIO = 0.05
+_FLOW_BUCKETS = 5
+_FLOW_BUCKET_DEPTH = 10
 
 
 class AssetTwin:
@@ -45,8 +56,20 @@ class AssetTwin:
     
     Maintains telemetry history and provides predictive maintenance
     assessments based on configurable rules.
+    
+    Telemetry is stored column-wise in a TelemetryBuffer rather than as
+    TelemetryPoint objects, so rule evaluation scans contiguous arrays.
+    Only the last two evaluation windows (relative to the newest point) are
+    retained, so memory and evaluation cost stay bounded for long-lived twins.
+    
+    The last assessment is cached and reused while the telemetry, the set of
+    rules, and the points inside the evaluation window are all unchanged, so
+    repeated polling does not re-run the rules.
     """
 
+    # Fleets hold thousands of twins: no per-instance __dict__
+    __slots__ = ("config", "rule_engine", "_buffer", "_rev", "_cache", "_flow_bucket")
+
     def __init__(self, config: TwinConfig, rule_engine: Optional[RuleEngine] = None):
         """
         Initialize asset twin.
@@ -57,13 +80,43 @@ class AssetTwin:
         """
         self.config = config
         self.rule_engine = rule_engine or RuleEngine()
-        self.telemetry: List[TelemetryPoint] = []
+        window_ns = config.thresholds.evaluation_window_days * _NS_PER_DAY
+        # EWMA time constant of half the window: its mean sample age then
+        # matches the window's, for rules such as FastFlowDegradationRule
+        self._buffer = TelemetryBuffer(
+            window_ns=_RETENTION_WINDOWS * window_ns,
+            ewma_tau_ns=window_ns // 2,
+        )
+        self._rev = 0  # Bumped on every telemetry mutation
+        self._cache: Optional[Tuple[tuple, List[RuleResult]]] = None
+        self._flow_bucket = BucketDetector(
+            mean=config.rated_flow,
+            sigma=config.rated_flow * _FLOW_SIGMA_RATIO,
+            buckets=_FLOW_BUCKETS,
+            depth=_FLOW_BUCKET_DEPTH,
+        )
 
     @property
     def asset_id(self) -> str:
         """Return asset ID for convenience."""
         return self.config.asset_id
 
+    @property
+    def buffer(self) -> TelemetryBuffer:
+        """Columnar telemetry store (live, sorted by timestamp)."""
+        self._buffer.flush()
+        return self._buffer
+
+    @property
+    def telemetry(self) -> List[TelemetryPoint]:
+        """
+        Telemetry history as TelemetryPoint objects, sorted by timestamp.
+        
+        Materialized from the buffer on each access; prefer ``buffer`` in
+        hot paths.
+        """
+        return list(self._buffer)
+
     def add_telemetry(self, point: TelemetryPoint) -> None:
         """
         Add a telemetry measurement to the twin's history.
@@ -71,9 +124,10 @@ class AssetTwin:
         Args:
             point: TelemetryPoint with flow, temperature, etc.
         """
-        self.telemetry.append(point)
-        # Keep telemetry sorted by timestamp
-        self.telemetry.sort(key=lambda t: t.timestamp)
+        # The buffer appends every point and sorts late arrivals lazily
+        self._buffer.append_point(point)
+        self._flow_bucket.update(point.flow)
+        self._rev += 1
 
     def add_telemetry_reading(
         self,
@@ -99,6 +153,49 @@ class AssetTwin:
         )
         self.add_telemetry(point)
 
+    def add_telemetry_batch(
+        self,
+        timestamps: Sequence[datetime],
+        flows: Sequence[float],
+        temperatures: Sequence[float],
+        pressures: Optional[Sequence[Optional[float]]] = None,
+    ) -> None:
+        """
+        Add many readings at once, validating the batch as a whole.
+        
+        Applies the same checks as TelemetryPoint without constructing a
+        point per reading. The batch is rejected entirely if any value is invalid.
+        
+        Args:
+            timestamps: When each measurement was taken.
+            flows: Flow rate measurements, aligned with timestamps.
+            temperatures: Temperature measurements, aligned with timestamps.
+            pressures: Optional pressure measurements (None where not measured).
+            
+        Raises:
+            ValueError: If the sequences differ in length or any value is out of range.
+        """
+        self._buffer.append_batch(
+            [to_epoch_ns(ts) for ts in timestamps],
+            flows,
+            temperatures,
+            pressures,
+        )
+        update = self._flow_bucket.update
+        for flow in flows:
+            update(flow)
+        self._rev += 1
+
+    def flow_degradation_sustained(self) -> bool:
+        """
+        O(1) check for sustained flow degradation, independent of the rules.
+        
+        Backed by a BucketDetector fed every reading in arrival order, with
+        buckets one 5%-of-rated-flow step apart below rated flow. Unlike the
+        windowed rules it ignores isolated dips and needs no window scan.
+        """
+        return self._flow_bucket.degraded
+
     def needs_maintenance(self) -> bool:
         """
         Determine if asset needs maintenance based on current telemetry.
@@ -106,7 +203,7 @@ class AssetTwin:
         Returns:
             True if any rule indicates maintenance is needed.
         """
-        return self.rule_engine.needs_maintenance(self.config, self.telemetry)
+        return any(r.needs_maintenance for r in self.get_maintenance_assessment())
 
     def get_maintenance_assessment(self) -> List[RuleResult]:
         """
@@ -115,27 +212,43 @@ class AssetTwin:
         Returns:
             List of RuleResult with reasons and triggered values.
         """
-        return self.rule_engine.evaluate(self.config, self.telemetry)
+        cutoff_ns = window_cutoff_ns(self.config)
+        # The window slides with the clock; the result only changes when a
+        # point enters or leaves it, so key on the window's start index.
+        key = (
+            self._rev,
+            self._buffer.window_start(cutoff_ns),
+            tuple(self.rule_engine.rules),
+        )
+        if self._cache is not None and self._cache[0] == key:
+            return list(self._cache[1])
+
+        results = self.rule_engine.evaluate(self.config, self._buffer, cutoff_ns)
+        self._cache = (key, results)
+        return list(results)
 
     def get_telemetry_count(self) -> int:
         """Return number of telemetry points stored."""
-        return len(self.telemetry)
+        return len(self._buffer)
 
     def get_latest_telemetry(self) -> Optional[TelemetryPoint]:
         """Return most recent telemetry point, or None if no data."""
-        if not self.telemetry:
+        buffer = self.buffer
+        if not buffer:
             return None
-        return self.telemetry[-1]
+        return buffer.point_at(len(buffer.timestamps_ns) - 1)
 
     def clear_telemetry(self) -> None:
         """Remove all telemetry data (useful for testing or data retention policies)."""
-        self.telemetry.clear()
+        self._buffer.clear()
+        self._flow_bucket.reset()
+        self._rev += 1
 
     def __repr__(self) -> str:
         return (
             f"AssetTwin(asset_id='{self.asset_id}', "
             f"type='{self.config.asset_type}', "
-            f"telemetry_points={len(self.telemetry)})"
+            f"telemetry_points={len(self._buffer)})"
         )
 
 
@@ -0,0 +1,99 @@
+"""
+Content-keyed cache for feature detector output.
+
+When several algorithms (or retries) see the same image, detection is by far
+the most expensive step. This cache memoizes whatever a detector produces for
+an image, keyed by the detector object and a digest of the image bytes, so a
+repeated (detector, image) pair costs one hash instead of a full detection.
+
+Stdlib only: images are hashed through the buffer protocol, so NumPy arrays
+work without importing NumPy here.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def image_key(image: Any) -> Tuple[Hashable, ...]:
+    """
+    Build a content key for an image-like buffer.
+
+    Args:
+        image: Any object supporting the buffer protocol (e.g., a NumPy array).
+
+    Returns:
+        Tuple of (digest, shape, dtype) identifying the image contents.
+    """
+    try:
+        digest = hashlib.blake2b(image, digest_size=16).digest()
+    except (BufferError, TypeError, ValueError):
+        # Non-contiguous views: hash a contiguous copy instead
+        digest = hashlib.blake2b(memoryview(image).tobytes(), digest_size=16).digest()
+    return (
+        digest,
+        getattr(image, "shape", None),
+        str(getattr(image, "dtype", "")),
+    )
+
+
+class FeatureCache:
+    """
+    Thread-safe LRU cache of detector output keyed by image content.
+
+    Entries are keyed on the detector object itself (two detectors with
+    different parameters never share entries) plus image_key(image). Because
+    keys are content-based, a changed reference image simply misses the cache;
+    stale entries age out of the LRU.
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        """
+        Args:
+            maxsize: Maximum number of (detector, image) entries to retain.
+
+        Raises:
+            ValueError: If maxsize is < 1.
+        """
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be >= 1, got {maxsize}")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, detector: Any, image: Any, compute: Callable[[], T]) -> T:
+        """
+        Return the cached value for (detector, image), computing it on a miss.
+
+        compute() runs outside the lock, so concurrent misses on the same key
+        may both compute; the last result stored wins.
+        """
+        key = (detector,) + image_key(image)
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            except KeyError:
+                pass
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -16,38 +16,131 @@ Design Pattern:
     implementation details.
 """
 
+import sys
 from abc import ABC, abstractmethod
-from typing import Any, Optional
-from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+from dataclasses import dataclass, field, fields
 
 
-@dataclass
+# __slots__ for per-attempt value objects; dataclass(slots=True) requires Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Shared read-only default, so results without metadata allocate nothing
+_EMPTY_METADATA: Mapping[str, Any] = MappingProxyType({})
+
+
+@dataclass(frozen=True, **_SLOTS)
 class RegistrationResult:
     """
     Container for registration algorithm output.
     
+    Frozen: results are shared between the engine, callers and caches, so
+    fields cannot be reassigned after construction. Results are hashable:
+    the hash covers score, inlier_ratio and matches_count only, because
+    homography (e.g., an ndarray) and metadata are usually unhashable.
+    
     Attributes:
         score: Quality score (0.0 to 1.0) of the alignment.
         inlier_ratio: Ratio of inlier matches to total matches.
         homography: Transformation matrix (e.g., 3x3 numpy array).
                     Type is Any to avoid forcing numpy dependency.
         matches_count: Number of feature matches found.
-        metadata: Optional algorithm-specific data.
+        metadata: Algorithm-specific data. Defaults to a shared, read-only
+                  empty mapping; use with_metadata() to add entries.
     """
     score: float
     inlier_ratio: float
-    homography: Any
+    homography: Any = field(hash=False)
     matches_count: int
-    metadata: Optional[dict] = None
+    metadata: Mapping[str, Any] = field(default_factory=lambda: _EMPTY_METADATA, hash=False)
 
     def __post_init__(self):
         """Validate result fields."""
+        if self.metadata is None:
+            object.__setattr__(self, 'metadata', _EMPTY_METADATA)
+        # Single combined check on the hot path; diagnosis only on failure
+        if not (
+            0.0 <= self.score <= 1.0
+            and 0.0 <= self.inlier_ratio <= 1.0
+            and self.matches_count >= 0
+        ):
+            self._raise_invalid()
+
+    def _raise_invalid(self) -> None:
+        """Raise ValueError naming the first invalid field."""
         if not 0.0 <= self.score <= 1.0:
             raise ValueError(f"Score must be in [0.0, 1.0], got {self.score}")
         if not 0.0 <= self.inlier_ratio <= 1.0:
             raise ValueError(f"Inlier ratio must be in [0.0, 1.0], got {self.inlier_ratio}")
-        if self.matches_count < 0:
-            raise ValueError(f"Matches count must be >= 0, got {self.matches_count}")
+        raise ValueError(f"Matches count must be >= 0, got {self.matches_count}")
+
+    @classmethod
+    def _unchecked(
+        cls,
+        score: float,
+        inlier_ratio: float,
+        homography: Any,
+        matches_count: int,
+        metadata: Optional[Mapping[str, Any]] = None,
+    ) -> "RegistrationResult":
+        """
+        Construct without running validation.
+        
+        For algorithm implementations whose metrics are in range by
+        construction; everything else should use the normal constructor.
+        """
+        if metadata is None:
+            metadata = _EMPTY_METADATA
+        result = cls.__new__(cls)
+        for name, value in zip(
+            _FIELD_NAMES, (score, inlier_ratio, homography, matches_count, metadata)
+        ):
+            object.__setattr__(result, name, value)
+        return result
+
+    def with_metadata(self, **entries: Any) -> "RegistrationResult":
+        """Return a copy of this result with entries added to its metadata."""
+        return self._unchecked(
+            self.score,
+            self.inlier_ratio,
+            self.homography,
+            self.matches_count,
+            {**self.metadata, **entries},
+        )
+
+    def __reduce__(self):
+        """
+        Pickle as the bare field values, e.g. for results returned from worker processes.
+
+        The shared empty metadata travels as None and read-only mapping
+        proxies (not picklable themselves) as plain dicts; loading skips
+        validation since the values were validated when first built.
+        """
+        metadata = self.metadata
+        if metadata is _EMPTY_METADATA:
+            metadata = None
+        elif isinstance(metadata, MappingProxyType):
+            metadata = dict(metadata)
+        return (
+            self._unchecked,
+            (self.score, self.inlier_ratio, self.homography, self.matches_count, metadata),
+        )
+
+    def homography_json(self) -> Any:
+        """
+        Return the homography as nested lists for JSON serialization.
+
+        Algorithms keep the matrix in its native form (e.g., a float64 ndarray
+        ready for cv2.warpPerspective); conversion happens only here, on demand.
+        """
+        tolist = getattr(self.homography, "tolist", None)
+        if tolist is not None:
+            return tolist()
+        return [list(row) for row in self.homography]
+
+
+_FIELD_NAMES = tuple(f.name for f in fields(RegistrationResult))
 
 
 class AlgorithmBase(ABC):
@@ -56,8 +149,19 @@ class AlgorithmBase(ABC):
     
     Subclasses must implement the align() method to perform feature-based
     image registration.
+
+    Attributes:
+        expected_cost_hint: Relative cost of one align() call (higher is
+                            slower). With EngineConfig.order_by_cost the
+                            engine tries cheaper algorithms first; equal
+                            hints keep registration order.
     """
 
+    # Empty so slotted subclasses stay dict-free; others get __dict__ as usual
+    __slots__ = ()
+
+    expected_cost_hint: float = 1.0
+
     @abstractmethod
     def align(self, src_img: Any, ref_img: Any) -> Optional[RegistrationResult]:
         """
@@ -76,6 +180,35 @@ class AlgorithmBase(ABC):
         """
         pass
 
+    def align_gray(self, src_gray: Any, ref_gray: Any) -> Optional[RegistrationResult]:
+        """
+        Align images the engine has already converted to grayscale.
+
+        Override this when align() would otherwise convert its inputs itself;
+        an engine constructed with a grayscale converter then converts each
+        image once and calls align_gray() instead of align(). The default
+        simply delegates to align().
+        """
+        return self.align(src_gray, ref_gray)
+
+    def precompute(self, ref_img: Any) -> Any:
+        """
+        Do the reference-side work once for ImageRegistrationEngine.set_reference().
+
+        Override together with align_reference() to cache, e.g., reference
+        keypoints and descriptors across many source images. The default
+        context is the reference image itself.
+        """
+        return ref_img
+
+    def align_reference(self, src_img: Any, ref_ctx: Any) -> Optional[RegistrationResult]:
+        """
+        Align a source image against a context returned by precompute().
+
+        The default treats ref_ctx as the reference image and calls align().
+        """
+        return self.align(src_img, ref_ctx)
+
     @property
     def name(self) -> str:
         """Return algorithm name for logging and reporting."""
@@ -29,7 +29,7 @@ Classes:
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
 from dataclasses import dataclass, field
 
 from .algorithms import AlgorithmBase, RegistrationResult
@@ -48,10 +48,19 @@ class EngineConfig:
         min_score: Minimum score threshold for accepting an alignment (0.0 to 1.0).
         min_inlier_ratio: Minimum inlier ratio for accepting an alignment (0.0 to 1.0).
         enable_fallback: If True, return best available result even if below thresholds.
+        parallel: If True, run all algorithms concurrently in worker threads and
+                  accept the first acceptable result to complete. Worthwhile when
+                  algorithms release the GIL (e.g., OpenCV).
+        max_workers: Worker thread count for parallel mode (None: one per algorithm).
+        order_by_cost: If True, try algorithms in ascending expected_cost_hint
+                       (stable, so equal hints keep registration order).
     """
     min_score: float = 0.85
     min_inlier_ratio: float = 0.6
     enable_fallback: bool = True
+    parallel: bool = False
+    max_workers: Optional[int] = None
+    order_by_cost: bool = True
 
     def __post_init__(self):
         """Validate configuration values."""
@@ -59,6 +68,8 @@ class EngineConfig:
             raise ValueError(f"min_score must be in [0.0, 1.0], got {self.min_score}")
         if not 0.0 <= self.min_inlier_ratio <= 1.0:
             raise ValueError(f"min_inlier_ratio must be in [0.0, 1.0], got {self.min_inlier_ratio}")
+        if self.max_workers is not None and self.max_workers < 1:
+            raise ValueError(f"max_workers must be >= 1, got {self.max_workers}")
 
 
 @dataclass
@@ -70,7 +81,10 @@ class RegistrationOutput:
         algorithm: Name of the algorithm that produced this result.
         status: 'accepted' if thresholds met, 'fallback_low_confidence' if using best available.
         result: The underlying RegistrationResult.
-        attempts: List of algorithm names attempted, in order.
+        attempts: List of algorithm names attempted, in the order tried. In
+                  parallel mode, the attempts that finished, in completion
+                  order; attempts cancelled or still running when a result
+                  was accepted are not listed.
     """
     algorithm: str
     status: str
@@ -78,6 +92,15 @@ class RegistrationOutput:
     attempts: List[str] = field(default_factory=list)
 
 
+# Default for register(ref_img=...): use the reference from set_reference()
+_USE_REFERENCE: Any = object()
+
+
+def _accepts_gray(algo: AlgorithmBase) -> bool:
+    """True if the algorithm overrides AlgorithmBase.align_gray."""
+    return type(algo).align_gray is not AlgorithmBase.align_gray
+
+
 class ImageRegistrationEngine:
     """
     Multi-algorithm image registration engine.
@@ -85,39 +108,84 @@ class ImageRegistrationEngine:
     Attempts registration with multiple feature-based algorithms (SIFT, ORB, AKAZE, BRISK, etc.),
     scores each result, and returns the best alignment with confidence status.
     
-    Algorithms are tried in the order registered. Early exit occurs when a result
-    meets the configured quality thresholds.
+    Algorithms are tried cheapest first (by expected_cost_hint, see
+    EngineConfig.order_by_cost), otherwise in the order registered. Early exit
+    occurs when a result meets the configured quality thresholds. With EngineConfig.parallel, all
+    algorithms start at once and the first acceptable result to finish wins.
     """
 
     def __init__(
         self,
-        algorithms: Dict[str, AlgorithmBase],
+        algorithms: Union[Mapping[str, AlgorithmBase], Iterable[Tuple[str, AlgorithmBase]]],
         config: Optional[EngineConfig] = None,
         logger_override: Optional[logging.Logger] = None,
+        grayscale: Optional[Callable[[Any], Any]] = None,
     ):
         """
         Initialize the registration engine.
         
         Args:
-            algorithms: Dictionary mapping algorithm names to AlgorithmBase instances.
+            algorithms: Dictionary mapping algorithm names to AlgorithmBase instances,
+                        or an ordered iterable of (name, algorithm) pairs.
                         Example: {"SIFT": SIFTAlgorithm(), "ORB": ORBAlgorithm()}
+                        The engine keeps its own copy; use register_algorithm()
+                        and unregister_algorithm() to change it later.
             config: Engine configuration. Uses defaults if not provided.
             logger_override: Optional logger instance. Uses module logger if not provided.
+            grayscale: Optional image -> grayscale converter. When given, register()
+                       converts each image once and passes the result to every
+                       algorithm that overrides align_gray(), instead of each
+                       algorithm converting on its own.
             
         Raises:
             ConfigurationError: If algorithms dict is empty.
         """
-        if not algorithms:
+        self.algorithms: Dict[str, AlgorithmBase] = dict(algorithms)
+        if not self.algorithms:
             raise ConfigurationError("At least one algorithm must be provided")
 
-        self.algorithms = algorithms
         self.config = config or EngineConfig()
         self.logger = logger_override or logger
+        self.grayscale = grayscale
+        self._schedule: Tuple[Tuple[str, AlgorithmBase, float], ...] = ()
+        self._reference: Any = _USE_REFERENCE
+        self._ref_ctx: Dict[str, Any] = {}
+        self._rebuild_schedule()
+
+    def set_reference(self, ref_img: Any) -> None:
+        """
+        Precompute reference-side work for every algorithm.
+
+        Calls each algorithm's precompute(ref_img) once; subsequent
+        register(src_img) calls without ref_img reuse the stored contexts
+        (e.g., reference keypoints and descriptors) instead of redoing them
+        per scan. An algorithm whose precompute() raises falls back to
+        align(src_img, ref_img) with the stored image.
+
+        Args:
+            ref_img: Reference image shared by upcoming registrations.
+        """
+        self._reference = ref_img
+        self._ref_ctx = {}
+        for name, algo, _ in self._schedule:
+            self._precompute(name, algo)
+
+    def clear_reference(self) -> None:
+        """Drop the stored reference and its precomputed contexts."""
+        self._reference = _USE_REFERENCE
+        self._ref_ctx = {}
+
+    def _precompute(self, name: str, algo: AlgorithmBase) -> None:
+        """Store algo's reference context, logging (not raising) failures."""
+        try:
+            self._ref_ctx[name] = algo.precompute(self._reference)
+        except Exception as e:
+            self.logger.warning("Algorithm %s failed to precompute reference: %s", name, e)
 
     def register(
         self,
         src_img: Any,
-        ref_img: Any,
+        ref_img: Any = _USE_REFERENCE,
     ) -> RegistrationOutput:
         """
         Register source image to reference image using multiple algorithms.
@@ -129,68 +197,183 @@ class ImageRegistrationEngine:
         
         Args:
             src_img: Source image to align.
-            ref_img: Reference image to align to.
+            ref_img: Reference image to align to. If omitted, the reference
+                     from set_reference() is used with its precomputed contexts.
             
         Returns:
             RegistrationOutput with algorithm name, status, and result.
             
         Raises:
             RegistrationError: If no algorithm produces a valid homography and fallback is disabled.
+            ConfigurationError: If ref_img is omitted and no reference has been set.
         """
-        best_result: Optional[RegistrationResult] = None
-        best_algorithm: Optional[str] = None
-        attempts: List[str] = []
+        self.logger.info("Starting registration with %d algorithms", len(self._schedule))
 
-        self.logger.info(f"Starting registration with {len(self.algorithms)} algorithms")
+        refs: Optional[Dict[str, Any]] = None
+        if ref_img is _USE_REFERENCE:
+            if self._reference is _USE_REFERENCE:
+                raise ConfigurationError("No reference image: pass ref_img or call set_reference()")
+            ref_img, refs = self._reference, self._ref_ctx
+            gray = None
+        else:
+            gray = self._grayscale_pair(src_img, ref_img)
 
-        for name, algo in self.algorithms.items():
-            attempts.append(name)
-            self.logger.debug(f"Attempting algorithm: {name}")
+        if self.config.parallel:
+            return self._register_parallel(src_img, ref_img, gray, refs)
 
-            try:
-                result = algo.align(src_img, ref_img)
-            except Exception as e:
-                self.logger.warning(f"Algorithm {name} raised exception: {e}")
-                continue
+        schedule = self._schedule
+        best: Optional[Tuple[str, RegistrationResult]] = None
+
+        for i, (name, algo, _) in enumerate(schedule):
+            self.logger.debug("Attempting algorithm: %s", name)
 
+            result = self._attempt(name, algo, src_img, ref_img, gray, refs)
             if result is None:
-                self.logger.debug(f"Algorithm {name} returned None (no valid alignment)")
                 continue
 
-            self.logger.debug(
-                f"Algorithm {name}: score={result.score:.3f}, "
-                f"inlier_ratio={result.inlier_ratio:.3f}, "
-                f"matches={result.matches_count}"
-            )
-
             # Track best result seen so far
-            if best_result is None or result.score > best_result.score:
-                best_result = result
-                best_algorithm = name
+            if best is None or result.score > best[1].score:
+                best = (name, result)
 
             # Check if this result meets acceptance criteria
             if self._is_acceptable(result):
-                self.logger.info(
-                    f"Accepted result from {name} (score={result.score:.3f}, "
-                    f"inlier_ratio={result.inlier_ratio:.3f})"
-                )
-                return RegistrationOutput(
-                    algorithm=name,
-                    status="accepted",
-                    result=result,
-                    attempts=attempts,
-                )
-
-        # No algorithm met thresholds - fallback logic
-        if best_result is None:
+                return self._accept(name, result, [n for n, _, _ in schedule[:i + 1]])
+
+        return self._fallback(best, [n for n, _, _ in schedule])
+
+    def _register_parallel(
+        self,
+        src_img: Any,
+        ref_img: Any,
+        gray: Optional[Tuple[Any, Any]],
+        refs: Optional[Dict[str, Any]] = None,
+    ) -> RegistrationOutput:
+        """Run all algorithms concurrently; accept the first acceptable result to complete."""
+        # Imported here so serial-only users (and test collection) skip it
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        schedule = self._schedule
+        attempts: List[str] = []  # Completion order
+        results: Dict[str, RegistrationResult] = {}
+        executor = ThreadPoolExecutor(
+            max_workers=self.config.max_workers or len(self.algorithms),
+            thread_name_prefix="registration",
+        )
+        try:
+            futures = {
+                executor.submit(self._attempt, name, algo, src_img, ref_img, gray, refs): name
+                for name, algo, _ in schedule
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                attempts.append(name)
+                result = future.result()
+                if result is None:
+                    continue
+                if self._is_acceptable(result):
+                    for pending in futures:
+                        pending.cancel()
+                    return self._accept(name, result, attempts)
+                results[name] = result
+        finally:
+            # Don't block on algorithms still running after an early accept
+            executor.shutdown(wait=False)
+
+        # Pick the best in schedule order so ties resolve as in serial mode
+        best: Optional[Tuple[str, RegistrationResult]] = None
+        for name, _, _ in schedule:
+            result = results.get(name)
+            if result is not None and (best is None or result.score > best[1].score):
+                best = (name, result)
+        return self._fallback(best, attempts)
+
+    def _rebuild_schedule(self) -> None:
+        """
+        Snapshot algorithms as (name, algorithm, cost_hint) in attempt order.
+
+        register() iterates this immutable tuple instead of the dict, so it is
+        rebuilt whenever algorithms are (un)registered through the engine.
+        """
+        schedule = [
+            (name, algo, algo.expected_cost_hint)
+            for name, algo in self.algorithms.items()
+        ]
+        if self.config.order_by_cost:
+            schedule.sort(key=lambda entry: entry[2])
+        self._schedule = tuple(schedule)
+
+    def _grayscale_pair(self, src_img: Any, ref_img: Any) -> Optional[Tuple[Any, Any]]:
+        """Convert both images once if any algorithm can consume grayscale input."""
+        if self.grayscale is None or not any(_accepts_gray(algo) for _, algo, _ in self._schedule):
+            return None
+        return self.grayscale(src_img), self.grayscale(ref_img)
+
+    def _attempt(
+        self,
+        name: str,
+        algo: AlgorithmBase,
+        src_img: Any,
+        ref_img: Any,
+        gray: Optional[Tuple[Any, Any]] = None,
+        refs: Optional[Dict[str, Any]] = None,
+    ) -> Optional[RegistrationResult]:
+        """Run one algorithm, logging and swallowing its failures."""
+        try:
+            if refs is not None and name in refs:
+                result = algo.align_reference(src_img, refs[name])
+            elif gray is not None and _accepts_gray(algo):
+                result = algo.align_gray(*gray)
+            else:
+                result = algo.align(src_img, ref_img)
+        except Exception as e:
+            self.logger.warning("Algorithm %s raised exception: %s", name, e)
+            return None
+
+        if result is None:
+            self.logger.debug("Algorithm %s returned None (no valid alignment)", name)
+            return None
+
+        self.logger.debug(
+            "Algorithm %s: score=%.3f, inlier_ratio=%.3f, matches=%d",
+            name, result.score, result.inlier_ratio, result.matches_count,
+        )
+        return result
+
+    def _accept(
+        self,
+        name: str,
+        result: RegistrationResult,
+        attempts: List[str],
+    ) -> RegistrationOutput:
+        """Build the output for a result that met the thresholds."""
+        self.logger.info(
+            "Accepted result from %s (score=%.3f, inlier_ratio=%.3f)",
+            name, result.score, result.inlier_ratio,
+        )
+        return RegistrationOutput(
+            algorithm=name,
+            status="accepted",
+            result=result,
+            attempts=attempts,
+        )
+
+    def _fallback(
+        self,
+        best: Optional[Tuple[str, RegistrationResult]],
+        attempts: List[str],
+    ) -> RegistrationOutput:
+        """Apply fallback policy when no algorithm met the thresholds."""
+        if best is None:
             self.logger.error("No algorithm produced a valid homography")
             raise RegistrationError(
                 f"No alignment produced a valid homography. Attempted: {', '.join(attempts)}"
             )
 
+        best_algorithm, best_result = best
         if not self.config.enable_fallback:
             self.logger.error(
-                f"Best result from {best_algorithm} did not meet thresholds and fallback is disabled"
+                "Best result from %s did not meet thresholds and fallback is disabled",
+                best_algorithm,
             )
             raise RegistrationError(
                 f"No alignment met quality thresholds (min_score={self.config.min_score}, "
@@ -199,13 +382,10 @@ class ImageRegistrationEngine:
             )
 
         self.logger.warning(
-            f"Using fallback result from {best_algorithm} with score={best_result.score:.3f} "
-            f"(below threshold={self.config.min_score})"
+            "Using fallback result from %s with score=%.3f (below threshold=%s)",
+            best_algorithm, best_result.score, self.config.min_score,
         )
 
-        # best_algorithm is guaranteed to be set if best_result is not None
-        assert best_algorithm is not None
-
         return RegistrationOutput(
             algorithm=best_algorithm,
             status="fallback_low_confidence",
@@ -228,8 +408,12 @@ class ImageRegistrationEngine:
             name: Algorithm name.
             algorithm: AlgorithmBase instance.
         """
-        self.logger.info(f"Registering new algorithm: {name}")
+        self.logger.info("Registering new algorithm: %s", name)
         self.algorithms[name] = algorithm
+        self._rebuild_schedule()
+        if self._reference is not _USE_REFERENCE:
+            self._ref_ctx.pop(name, None)
+            self._precompute(name, algorithm)
 
     def unregister_algorithm(self, name: str) -> None:
         """
@@ -245,8 +429,10 @@ class ImageRegistrationEngine:
             raise ConfigurationError("Cannot remove the last algorithm")
         
         if name in self.algorithms:
-            self.logger.info(f"Unregistering algorithm: {name}")
+            self.logger.info("Unregistering algorithm: %s", name)
             del self.algorithms[name]
+            self._ref_ctx.pop(name, None)
+            self._rebuild_schedule()
 
 
 
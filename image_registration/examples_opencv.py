@@ -8,11 +8,234 @@ Copy and adapt as needed for your use case.
 # NOTE: Requires opencv-python (pip install opencv-python)
 # This file is for reference only and is not part of the library
 
+import logging
+import threading
+from itertools import chain
+
 import cv2
 import numpy as np
 from typing import Any, Optional
 
 from image_registration import AlgorithmBase, RegistrationResult
+from image_registration._feature_cache import FeatureCache
+
+# USAC MAGSAC++ is faster and more accurate than classic RANSAC (OpenCV >= 4.5)
+_HOMOGRAPHY_METHOD = getattr(cv2, "USAC_MAGSAC", cv2.RANSAC)
+
+logger = logging.getLogger(__name__)
+
+# Shared across algorithm instances so retries and batches against the same
+# reference image skip detection
+_FEATURES = FeatureCache(maxsize=32)
+
+def _opencl_available() -> bool:
+    """
+    Return True if detection may be dispatched to OpenCL via cv2.UMat.
+
+    Only reads OpenCV's state: OpenCL is used when a device exists and the
+    application has it enabled (see configure_opencv()).
+    """
+    return bool(cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL())
+
+
+def configure_opencv(num_threads: Optional[int] = None, use_opencl: Optional[bool] = None) -> None:
+    """
+    Opt-in, process-wide OpenCV tuning. Nothing in this module calls it.
+
+    Enables OpenCV's SIMD-dispatched code paths and, if given, sizes OpenCV's
+    thread pool and switches OpenCL (the T-API used by prefer_umat) on or off.
+    All of these settings are global to the process, so only call this from
+    the application that owns OpenCV's configuration.
+    With EngineConfig.parallel, algorithms already run on the engine's own
+    threads; keep num_threads small to avoid oversubscribing cores.
+
+    With DEBUG logging, also logs the CPU features the build was compiled for
+    and dispatches to (e.g., whether ORB's FAST/BRIEF loops can use AVX2).
+
+    Args:
+        num_threads: OpenCV thread pool size (None leaves it unchanged).
+        use_opencl: Enable or disable OpenCL (None leaves it unchanged).
+    """
+    cv2.setUseOptimized(True)
+    if num_threads is not None:
+        cv2.setNumThreads(num_threads)
+    if use_opencl is not None:
+        cv2.ocl.setUseOpenCL(use_opencl)
+    if logger.isEnabledFor(logging.DEBUG):
+        cpu_lines = [
+            line.strip()
+            for line in cv2.getBuildInformation().splitlines()
+            if line.strip().startswith(("Baseline:", "Dispatched code:"))
+        ]
+        logger.debug("OpenCV CPU features: %s", "; ".join(cpu_lines))
+
+
+def _detect_and_compute(detector, img: np.ndarray, use_umat: bool):
+    """
+    detectAndCompute on the OpenCL device when allowed, otherwise on the host.
+
+    Descriptors always come back as host ndarrays; matching and RANSAC stay
+    on the CPU. Errors from the UMat call propagate (see _detect_for()).
+    """
+    if use_umat and _opencl_available():
+        kps, desc = detector.detectAndCompute(cv2.UMat(img), None)
+        if isinstance(desc, cv2.UMat):
+            desc = desc.get()
+        return kps, desc
+    return detector.detectAndCompute(img, None)
+
+
+def _cached_detect(detector, gray: np.ndarray, scale: float = 1.0, use_umat: bool = False):
+    """
+    Run detectAndCompute through the feature cache.
+
+    With scale < 1 detection runs on a downsampled copy (INTER_AREA) and the
+    keypoint coordinates are mapped back to full resolution, so the homography
+    is estimated directly in full-resolution pixels.
+
+    With use_umat, detection is dispatched through cv2.UMat (OpenCL) when a
+    device is available.
+
+    Only the ndarray form is cached to keep entries small.
+
+    Returns:
+        (kp_pts, descriptors): (N, 2) float32 keypoint coordinates and the
+        descriptor matrix (None if nothing was detected).
+    """
+    def compute():
+        img = gray
+        if scale != 1.0:
+            img = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        kps, desc = _detect_and_compute(detector, img, use_umat)
+        if not kps:
+            return np.empty((0, 2), dtype=np.float32), None
+        # Keypoint coordinates as (N, 2) float32 arrays, converted in C
+        pts = cv2.KeyPoint_convert(kps)
+        if scale != 1.0:
+            pts /= scale
+        return pts, desc
+
+    return _FEATURES.get_or_compute((detector, scale), gray, compute)
+
+
+def _detect_for(algo, gray: np.ndarray):
+    """
+    _cached_detect with an algorithm's detector and settings.
+
+    If a UMat call fails, that algorithm instance switches to host detection
+    for the rest of its life and the detection is retried on the host;
+    OpenCV's process-wide OpenCL setting is left alone.
+    """
+    if algo._use_umat:
+        try:
+            return _cached_detect(algo.detector, gray, algo.detect_scale, True)
+        except cv2.error:
+            algo._use_umat = False
+            logger.warning("%s: OpenCL detection failed, using host detection", type(algo).__name__)
+    return _cached_detect(algo.detector, gray, algo.detect_scale, False)
+
+
+def to_gray(img: np.ndarray) -> np.ndarray:
+    """
+    Convert a BGR image to grayscale (grayscale input is returned as-is).
+
+    Pass as ImageRegistrationEngine(grayscale=to_gray) so each image is
+    converted once per register() call rather than once per algorithm.
+    """
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+
+
+def _check_scale(detect_scale: float) -> float:
+    """Validate a detection scale factor."""
+    if not 0.0 < detect_scale <= 1.0:
+        raise ValueError(f"detect_scale must be in (0.0, 1.0], got {detect_scale}")
+    return detect_scale
+
+
+def _ratio_test(matches, ratio: float = 0.75):
+    """
+    Apply Lowe's ratio test to knnMatch(k=2) output.
+
+    The DMatch pairs are flattened once into a single (N, 4) array so the
+    test itself is a single vectorized compare. That flatten - reading
+    attributes off DMatch objects - is the only interpreter-bound step left;
+    a JIT (Numba) cannot compile it, which is why there is no JIT kernel here.
+
+    Returns:
+        (qidx, tidx): int32 query/train indices of the matches that pass.
+    """
+    # Stream attributes straight into a typed buffer: no intermediate list of
+    # tuples and no dtype inference. float64 holds the indices exactly.
+    # Every query has two neighbours: callers require >= 4 train descriptors
+    flat = np.fromiter(
+        chain.from_iterable(
+            (m.distance, n.distance, m.queryIdx, m.trainIdx) for m, n in matches
+        ),
+        dtype=np.float64,
+    ).reshape(-1, 4)
+    if not len(flat):
+        empty = np.empty(0, dtype=np.int32)
+        return empty, empty
+    good = flat[:, 0] < ratio * flat[:, 1]
+    idx = flat[good, 2:].astype(np.int32)
+    return idx[:, 0], idx[:, 1]
+
+
+def _best_matches(matches, keep: float):
+    """
+    Keep the lowest-distance fraction of one-to-one (crossCheck) matches.
+
+    Returns:
+        (qidx, tidx): int32 query/train indices of the kept matches.
+    """
+    flat = np.fromiter(
+        chain.from_iterable((m.distance, m.queryIdx, m.trainIdx) for m in matches),
+        dtype=np.float64,
+    ).reshape(-1, 3)
+    if keep < 1.0 and len(flat):
+        flat = flat[flat[:, 0] <= np.quantile(flat[:, 0], keep)]
+    idx = flat[:, 1:].astype(np.int32)
+    return idx[:, 0], idx[:, 1]
+
+
+# Bit counts for every byte value (fallback when np.bitwise_count is unavailable)
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _hamming_ratio_test(desc1: np.ndarray, desc2: np.ndarray, ratio: float = 0.75, block: int = 256):
+    """
+    Brute-force Hamming 2-NN matching plus Lowe's ratio test in NumPy.
+
+    Equivalent to BFMatcher(NORM_HAMMING).knnMatch(k=2) followed by
+    _ratio_test, without building DMatch objects. Descriptors are XORed in
+    row blocks (bounding the (block, N2, W) temporary) and popcounted with
+    np.bitwise_count on uint64 words (NumPy >= 2.0, hardware POPCNT) or a
+    byte lookup table otherwise.
+
+    Returns:
+        (qidx, tidx): int32 query/train indices of the matches that pass.
+    """
+    empty = np.empty(0, dtype=np.int32)
+    if len(desc1) == 0 or len(desc2) < 2:
+        return empty, empty
+
+    use_bitcount = hasattr(np, "bitwise_count") and desc1.shape[1] % 8 == 0
+    if use_bitcount:
+        d1 = np.ascontiguousarray(desc1).view(np.uint64)
+        d2 = np.ascontiguousarray(desc2).view(np.uint64)
+    else:
+        d1, d2 = desc1, desc2
+
+    qidx, tidx = [], []
+    for start in range(0, len(d1), block):
+        x = d1[start:start + block, None, :] ^ d2[None, :, :]
+        counts = np.bitwise_count(x) if use_bitcount else _POPCOUNT8[x]
+        dist = counts.sum(axis=2, dtype=np.int32)
+        nearest = np.partition(dist, 1, axis=1)
+        good = np.flatnonzero(nearest[:, 0] < ratio * nearest[:, 1])
+        qidx.append(good + start)
+        tidx.append(dist[good].argmin(axis=1))
+    return np.concatenate(qidx).astype(np.int32), np.concatenate(tidx).astype(np.int32)
 
 
 class SIFTAlgorithm(AlgorithmBase):
@@ -22,12 +245,27 @@ class SIFTAlgorithm(AlgorithmBase):
     Requires: opencv-contrib-python or opencv-python with SIFT support
     """
 
-    def __init__(self, n_features: int = 0, n_octave_layers: int = 3):
+    # Several times slower than ORB; tried after cheaper algorithms by default
+    expected_cost_hint = 5.0
+
+    def __init__(
+        self,
+        n_features: int = 0,
+        n_octave_layers: int = 3,
+        detect_scale: float = 1.0,
+        prefer_umat: bool = True,
+    ):
         """
         Args:
             n_features: Number of best features to retain (0 = all).
             n_octave_layers: Number of layers in each octave.
+            detect_scale: Pyramid factor applied before detection (e.g., 0.5
+                          detects on a quarter of the pixels). 1.0 disables it.
+            prefer_umat: Run detection through cv2.UMat when OpenCL is available and enabled.
         """
+        self.detect_scale = _check_scale(detect_scale)
+        self.prefer_umat = prefer_umat
+        self._use_umat = prefer_umat  # Cleared if a UMat call fails
         self.detector = cv2.SIFT_create(
             nfeatures=n_features,
             nOctaveLayers=n_octave_layers,
@@ -37,58 +275,85 @@ class SIFTAlgorithm(AlgorithmBase):
     def align(self, src_img: np.ndarray, ref_img: np.ndarray) -> Optional[RegistrationResult]:
         """Perform SIFT-based alignment."""
         try:
-            # Convert to grayscale if needed
-            src_gray = cv2.cvtColor(src_img, cv2.COLOR_BGR2GRAY) if len(src_img.shape) == 3 else src_img
-            ref_gray = cv2.cvtColor(ref_img, cv2.COLOR_BGR2GRAY) if len(ref_img.shape) == 3 else ref_img
+            src_gray, ref_gray = to_gray(src_img), to_gray(ref_img)
+        except Exception:
+            return None
+        return self.align_gray(src_gray, ref_gray)
+
+    def align_gray(self, src_gray: np.ndarray, ref_gray: np.ndarray) -> Optional[RegistrationResult]:
+        """Perform SIFT-based alignment on grayscale images."""
+        try:
+            ref_ctx = self._detect(ref_gray)
+        except Exception:
+            return None
+        return self._align_to(src_gray, ref_ctx)
+
+    def precompute(self, ref_img: np.ndarray):
+        """Detect reference keypoints and descriptors once (see set_reference)."""
+        return self._detect(to_gray(ref_img))
+
+    def align_reference(self, src_img: np.ndarray, ref_ctx) -> Optional[RegistrationResult]:
+        """Align against reference features returned by precompute()."""
+        try:
+            src_gray = to_gray(src_img)
+        except Exception:
+            return None
+        return self._align_to(src_gray, ref_ctx)
 
-            # Detect keypoints and compute descriptors
-            kp1, desc1 = self.detector.detectAndCompute(src_gray, None)
-            kp2, desc2 = self.detector.detectAndCompute(ref_gray, None)
+    def _detect(self, gray: np.ndarray):
+        """(kp_pts, descriptors) for a grayscale image, via the feature cache."""
+        return _detect_for(self, gray)
 
-            if desc1 is None or desc2 is None or len(kp1) < 4 or len(kp2) < 4:
+    def _align_to(self, src_gray: np.ndarray, ref_ctx) -> Optional[RegistrationResult]:
+        """Align a grayscale source against reference (kp_pts, descriptors)."""
+        try:
+            # Detect keypoints and compute descriptors (cached by image content)
+            kp1_pts, desc1 = self._detect(src_gray)
+            kp2_pts, desc2 = ref_ctx
+
+            if desc1 is None or desc2 is None or len(kp1_pts) < 4 or len(kp2_pts) < 4:
                 return None
 
             # Match features
             matches = self.matcher.knnMatch(desc1, desc2, k=2)
 
             # Apply Lowe's ratio test
-            good_matches = []
-            for match_pair in matches:
-                if len(match_pair) == 2:
-                    m, n = match_pair
-                    if m.distance < 0.75 * n.distance:
-                        good_matches.append(m)
-
-            if len(good_matches) < 4:
+            qidx, tidx = _ratio_test(matches)
+            n_good = len(qidx)
+
+            if n_good < 4:
                 return None
 
-            # Extract matched keypoint coordinates
-            src_pts = np.float32([kp1[m.queryIdx].pt for m in good_matches]).reshape(-1, 1, 2)
-            ref_pts = np.float32([kp2[m.trainIdx].pt for m in good_matches]).reshape(-1, 1, 2)
+            # Gather matched keypoint coordinates in one vectorized index
+            src_pts = kp1_pts[qidx][:, None, :]
+            ref_pts = kp2_pts[tidx][:, None, :]
 
-            # Compute homography with RANSAC
-            H, mask = cv2.findHomography(src_pts, ref_pts, cv2.RANSAC, 5.0)
+            # Compute homography with MAGSAC++ (RANSAC on OpenCV < 4.5)
+            H, mask = cv2.findHomography(
+                src_pts, ref_pts, _HOMOGRAPHY_METHOD, 5.0, maxIters=2000, confidence=0.999
+            )
 
             if H is None:
                 return None
 
             # Calculate metrics
-            inliers = np.sum(mask)
-            inlier_ratio = inliers / len(good_matches)
+            inliers = int(np.count_nonzero(mask))
+            inlier_ratio = inliers / mask.size
 
             # Simple scoring: weighted combination of inlier ratio and match count
-            match_score = min(len(good_matches) / 100.0, 1.0)  # Normalize to [0,1]
+            match_score = min(n_good / 100.0, 1.0)  # Normalize to [0,1]
             score = 0.7 * inlier_ratio + 0.3 * match_score
 
-            return RegistrationResult(
+            # Both ratios are in [0, 1] by construction: skip validation
+            return RegistrationResult._unchecked(
                 score=score,
                 inlier_ratio=inlier_ratio,
-                homography=H.tolist(),  # Convert to list for JSON serialization
-                matches_count=len(good_matches),
+                homography=H,  # float64 ndarray; use homography_json() to serialize
+                matches_count=n_good,
                 metadata={
-                    "total_keypoints_src": len(kp1),
-                    "total_keypoints_ref": len(kp2),
-                    "inliers": int(inliers),
+                    "total_keypoints_src": len(kp1_pts),
+                    "total_keypoints_ref": len(kp2_pts),
+                    "inliers": inliers,
                 },
             )
 
@@ -104,60 +369,225 @@ class ORBAlgorithm(AlgorithmBase):
     Faster than SIFT but may be less accurate.
     """
 
-    def __init__(self, n_features: int = 500):
+    expected_cost_hint = 1.0
+
+    def __init__(
+        self,
+        n_features: int = 500,
+        detect_scale: float = 1.0,
+        prefer_umat: bool = True,
+        use_np_matcher: bool = True,
+        fast_threshold: int = 20,
+        match_strategy: str = "lowe",
+        crosscheck_keep: float = 0.8,
+    ):
         """
         Args:
             n_features: Maximum number of features to detect.
+            detect_scale: Pyramid factor applied before detection (1.0 disables it).
+            prefer_umat: Run detection through cv2.UMat when OpenCL is available and enabled.
+            use_np_matcher: Match with the NumPy popcount routine instead of BFMatcher.
+            fast_threshold: FAST corner threshold; higher values keep fewer,
+                            stronger corners and cut detection time.
+            match_strategy: "lowe" (2-NN + ratio test) or "crosscheck" (mutual
+                            best matches via BFMatcher(crossCheck=True)).
+            crosscheck_keep: Fraction of crosscheck matches kept, best
+                             (lowest distance) first.
+
+        Raises:
+            ValueError: If match_strategy is unknown or crosscheck_keep is not in (0, 1].
         """
-        self.detector = cv2.ORB_create(nfeatures=n_features)
-        self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)
+        if match_strategy not in ("lowe", "crosscheck"):
+            raise ValueError(f"match_strategy must be 'lowe' or 'crosscheck', got {match_strategy!r}")
+        if not 0.0 < crosscheck_keep <= 1.0:
+            raise ValueError(f"crosscheck_keep must be in (0.0, 1.0], got {crosscheck_keep}")
+        self.detect_scale = _check_scale(detect_scale)
+        self.prefer_umat = prefer_umat
+        self._use_umat = prefer_umat  # Cleared if a UMat call fails
+        self.use_np_matcher = use_np_matcher
+        self.match_strategy = match_strategy
+        self.crosscheck_keep = crosscheck_keep
+        self.detector = cv2.ORB_create(nfeatures=n_features, fastThreshold=fast_threshold)
+        self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=match_strategy == "crosscheck")
 
     def align(self, src_img: np.ndarray, ref_img: np.ndarray) -> Optional[RegistrationResult]:
         """Perform ORB-based alignment."""
         try:
-            src_gray = cv2.cvtColor(src_img, cv2.COLOR_BGR2GRAY) if len(src_img.shape) == 3 else src_img
-            ref_gray = cv2.cvtColor(ref_img, cv2.COLOR_BGR2GRAY) if len(ref_img.shape) == 3 else ref_img
+            src_gray, ref_gray = to_gray(src_img), to_gray(ref_img)
+        except Exception:
+            return None
+        return self.align_gray(src_gray, ref_gray)
+
+    def align_gray(self, src_gray: np.ndarray, ref_gray: np.ndarray) -> Optional[RegistrationResult]:
+        """Perform ORB-based alignment on grayscale images."""
+        try:
+            ref_ctx = self._detect(ref_gray)
+        except Exception:
+            return None
+        return self._align_to(src_gray, ref_ctx)
 
-            kp1, desc1 = self.detector.detectAndCompute(src_gray, None)
-            kp2, desc2 = self.detector.detectAndCompute(ref_gray, None)
+    def precompute(self, ref_img: np.ndarray):
+        """Detect reference keypoints and descriptors once (see set_reference)."""
+        return self._detect(to_gray(ref_img))
 
-            if desc1 is None or desc2 is None or len(kp1) < 4 or len(kp2) < 4:
+    def align_reference(self, src_img: np.ndarray, ref_ctx) -> Optional[RegistrationResult]:
+        """Align against reference features returned by precompute()."""
+        try:
+            src_gray = to_gray(src_img)
+        except Exception:
+            return None
+        return self._align_to(src_gray, ref_ctx)
+
+    def _detect(self, gray: np.ndarray):
+        """(kp_pts, descriptors) for a grayscale image, via the feature cache."""
+        return _detect_for(self, gray)
+
+    def _align_to(self, src_gray: np.ndarray, ref_ctx) -> Optional[RegistrationResult]:
+        """Align a grayscale source against reference (kp_pts, descriptors)."""
+        try:
+            kp1_pts, desc1 = self._detect(src_gray)
+            kp2_pts, desc2 = ref_ctx
+
+            if desc1 is None or desc2 is None or len(kp1_pts) < 4 or len(kp2_pts) < 4:
                 return None
 
-            matches = self.matcher.knnMatch(desc1, desc2, k=2)
+            if self.match_strategy == "crosscheck":
+                qidx, tidx = _best_matches(self.matcher.match(desc1, desc2), self.crosscheck_keep)
+            elif self.use_np_matcher:
+                qidx, tidx = _hamming_ratio_test(desc1, desc2)
+            else:
+                qidx, tidx = _ratio_test(self.matcher.knnMatch(desc1, desc2, k=2))
+            n_good = len(qidx)
+
+            if n_good < 4:
+                return None
+
+            src_pts = kp1_pts[qidx][:, None, :]
+            ref_pts = kp2_pts[tidx][:, None, :]
+
+            H, mask = cv2.findHomography(
+                src_pts, ref_pts, _HOMOGRAPHY_METHOD, 5.0, maxIters=2000, confidence=0.999
+            )
+
+            if H is None:
+                return None
+
+            inliers = int(np.count_nonzero(mask))
+            inlier_ratio = inliers / mask.size
+            match_score = min(n_good / 100.0, 1.0)
+            score = 0.7 * inlier_ratio + 0.3 * match_score
+
+            # Both ratios are in [0, 1] by construction: skip validation
+            return RegistrationResult._unchecked(
+                score=score,
+                inlier_ratio=inlier_ratio,
+                homography=H,
+                matches_count=n_good,
+                metadata={
+                    "total_keypoints_src": len(kp1_pts),
+                    "total_keypoints_ref": len(kp2_pts),
+                    "inliers": inliers,
+                },
+            )
+
+        except Exception:
+            return None
 
-            good_matches = []
-            for match_pair in matches:
-                if len(match_pair) == 2:
-                    m, n = match_pair
-                    if m.distance < 0.75 * n.distance:
-                        good_matches.append(m)
 
-            if len(good_matches) < 4:
+class CudaORBAlgorithm(AlgorithmBase):
+    """
+    ORB registration on a CUDA device.
+
+    Detection, description and Hamming matching run on the GPU; only the
+    match metadata and keypoints come back to the host for Lowe filtering
+    and RANSAC. Falls back to CPU ORBAlgorithm when OpenCV has no CUDA
+    device (or was built without CUDA).
+
+    Requires: OpenCV built with CUDA (opencv-contrib with cudafeatures2d)
+    """
+
+    def __init__(self, n_features: int = 500):
+        """
+        Args:
+            n_features: Maximum number of features to detect.
+        """
+        self._cpu: Optional[ORBAlgorithm] = None
+        if not hasattr(cv2, "cuda") or cv2.cuda.getCudaEnabledDeviceCount() == 0:
+            self._cpu = ORBAlgorithm(n_features=n_features)
+            self.expected_cost_hint = self._cpu.expected_cost_hint
+            return
+        self.expected_cost_hint = 0.5
+        self.detector = cv2.cuda_ORB.create(nfeatures=n_features)
+        self.matcher = cv2.cuda.DescriptorMatcher_createBFMatcher(cv2.NORM_HAMMING)
+        self._d_src = cv2.cuda_GpuMat()
+        self._d_ref = cv2.cuda_GpuMat()
+        # The device buffers, detector and matcher are per-instance state:
+        # concurrent register() calls, or parallel-mode attempts the engine
+        # abandoned but did not stop, must not interleave on them
+        self._device_lock = threading.Lock()
+
+    def align(self, src_img: np.ndarray, ref_img: np.ndarray) -> Optional[RegistrationResult]:
+        """Perform ORB-based alignment on the GPU."""
+        try:
+            src_gray, ref_gray = to_gray(src_img), to_gray(ref_img)
+        except Exception:
+            return None
+        return self.align_gray(src_gray, ref_gray)
+
+    def align_gray(self, src_gray: np.ndarray, ref_gray: np.ndarray) -> Optional[RegistrationResult]:
+        """Perform ORB-based alignment of grayscale images on the GPU."""
+        if self._cpu is not None:
+            return self._cpu.align_gray(src_gray, ref_gray)
+        try:
+            with self._device_lock:
+                # Reuse device buffers across calls
+                self._d_src.upload(src_gray)
+                self._d_ref.upload(ref_gray)
+
+                d_kp1, d_desc1 = self.detector.detectAndComputeAsync(self._d_src, None)
+                d_kp2, d_desc2 = self.detector.detectAndComputeAsync(self._d_ref, None)
+
+                kp1 = self.detector.convert(d_kp1)
+                kp2 = self.detector.convert(d_kp2)
+
+                if d_desc1.empty() or d_desc2.empty() or len(kp1) < 4 or len(kp2) < 4:
+                    return None
+
+                # Descriptors stay on the device; only DMatch metadata is downloaded
+                matches = self.matcher.knnMatch(d_desc1, d_desc2, k=2)
+
+            qidx, tidx = _ratio_test(matches)
+            n_good = len(qidx)
+
+            if n_good < 4:
                 return None
 
-            src_pts = np.float32([kp1[m.queryIdx].pt for m in good_matches]).reshape(-1, 1, 2)
-            ref_pts = np.float32([kp2[m.trainIdx].pt for m in good_matches]).reshape(-1, 1, 2)
+            src_pts = cv2.KeyPoint_convert(kp1)[qidx][:, None, :]
+            ref_pts = cv2.KeyPoint_convert(kp2)[tidx][:, None, :]
 
-            H, mask = cv2.findHomography(src_pts, ref_pts, cv2.RANSAC, 5.0)
+            H, mask = cv2.findHomography(
+                src_pts, ref_pts, _HOMOGRAPHY_METHOD, 5.0, maxIters=2000, confidence=0.999
+            )
 
             if H is None:
                 return None
 
-            inliers = np.sum(mask)
-            inlier_ratio = inliers / len(good_matches)
-            match_score = min(len(good_matches) / 100.0, 1.0)
+            inliers = int(np.count_nonzero(mask))
+            inlier_ratio = inliers / mask.size
+            match_score = min(n_good / 100.0, 1.0)
             score = 0.7 * inlier_ratio + 0.3 * match_score
 
-            return RegistrationResult(
+            # Both ratios are in [0, 1] by construction: skip validation
+            return RegistrationResult._unchecked(
                 score=score,
                 inlier_ratio=inlier_ratio,
-                homography=H.tolist(),
-                matches_count=len(good_matches),
+                homography=H,
+                matches_count=n_good,
                 metadata={
                     "total_keypoints_src": len(kp1),
                     "total_keypoints_ref": len(kp2),
-                    "inliers": int(inliers),
+                    "inliers": inliers,
+                    "device": "cuda",
                 },
             )
 
@@ -174,7 +604,7 @@ if __name__ == "__main__":
         "ORB": ORBAlgorithm(),
     }
 
-    engine = ImageRegistrationEngine(algorithms=algorithms)
+    engine = ImageRegistrationEngine(algorithms=algorithms, grayscale=to_gray)
 
     # Load test images
     src = cv2.imread("test_src.jpg")
@@ -0,0 +1,116 @@
+"""
+XFeat learned-feature algorithm (reference only - requires PyTorch and OpenCV).
+
+Like examples_opencv.py, this is NOT part of the core library. Register it
+ahead of the OpenCV algorithms on GPU machines; the engine's fallback chain
+still covers deployments without a GPU.
+"""
+
+# NOTE: Requires torch and opencv-python; the model is fetched via torch.hub
+# from verlab/accelerated_features on first use.
+
+import cv2
+import numpy as np
+import torch
+from typing import Any, Optional
+
+from image_registration import AlgorithmBase, RegistrationResult
+
+# USAC MAGSAC++ is faster and more accurate than classic RANSAC (OpenCV >= 4.5)
+_HOMOGRAPHY_METHOD = getattr(cv2, "USAC_MAGSAC", cv2.RANSAC)
+
+
+class XFeatAlgorithm(AlgorithmBase):
+    """
+    XFeat (accelerated features) based registration on a Torch device.
+
+    Source and reference are stacked into one (2, C, H, W) batch so both
+    images go through a single forward pass; matching uses XFeat's built-in
+    mutual nearest-neighbour matcher and RANSAC runs on the CPU.
+    """
+
+    def __init__(
+        self,
+        top_k: int = 4096,
+        min_cossim: float = 0.82,
+        device: Optional[str] = None,
+        model: Any = None,
+    ):
+        """
+        Args:
+            top_k: Maximum keypoints kept per image.
+            min_cossim: Minimum cosine similarity for a match.
+            device: Torch device (default: 'cuda' when available, else 'cpu').
+            model: Preloaded XFeat instance (default: load via torch.hub).
+        """
+        self.top_k = top_k
+        self.min_cossim = min_cossim
+        self.device = torch.device(device or ("cuda" if torch.cuda.is_available() else "cpu"))
+        # Cheap on a GPU; on the CPU it is slower than SIFT
+        self.expected_cost_hint = 0.5 if self.device.type == "cuda" else 8.0
+        if model is None:
+            model = torch.hub.load("verlab/accelerated_features", "XFeat", pretrained=True, top_k=top_k)
+        self.model = model.to(self.device).eval()
+
+    def _to_tensor(self, img: np.ndarray) -> torch.Tensor:
+        """HxW or HxWxC uint8 image -> CxHxW float tensor on the host."""
+        t = torch.from_numpy(np.ascontiguousarray(img))
+        t = t[None] if t.ndim == 2 else t.permute(2, 0, 1)
+        return t.float()
+
+    def align(self, src_img: np.ndarray, ref_img: np.ndarray) -> Optional[RegistrationResult]:
+        """Perform XFeat-based alignment."""
+        try:
+            src_t = self._to_tensor(src_img)
+            ref_t = self._to_tensor(ref_img)
+
+            with torch.inference_mode():
+                if src_t.shape == ref_t.shape:
+                    batch = torch.stack([src_t, ref_t]).to(self.device, non_blocking=True)
+                    feats = self.model.detectAndCompute(batch, top_k=self.top_k)
+                else:
+                    # Mismatched sizes cannot be stacked: two single-image passes
+                    feats = [
+                        self.model.detectAndCompute(t[None].to(self.device, non_blocking=True), top_k=self.top_k)[0]
+                        for t in (src_t, ref_t)
+                    ]
+                idx0, idx1 = self.model.match(
+                    feats[0]["descriptors"], feats[1]["descriptors"], self.min_cossim
+                )
+
+            n_good = len(idx0)
+            if n_good < 4:
+                return None
+
+            src_pts = feats[0]["keypoints"][idx0].cpu().numpy()
+            ref_pts = feats[1]["keypoints"][idx1].cpu().numpy()
+
+            H, mask = cv2.findHomography(
+                src_pts, ref_pts, _HOMOGRAPHY_METHOD, 5.0, maxIters=2000, confidence=0.999
+            )
+
+            if H is None:
+                return None
+
+            inliers = int(np.count_nonzero(mask))
+            inlier_ratio = inliers / mask.size
+            match_score = min(n_good / 100.0, 1.0)
+            score = 0.7 * inlier_ratio + 0.3 * match_score
+
+            # Both ratios are in [0, 1] by construction: skip validation
+            return RegistrationResult._unchecked(
+                score=score,
+                inlier_ratio=inlier_ratio,
+                homography=H,
+                matches_count=n_good,
+                metadata={
+                    "total_keypoints_src": len(feats[0]["keypoints"]),
+                    "total_keypoints_ref": len(feats[1]["keypoints"]),
+                    "inliers": inliers,
+                    "device": self.device.type,
+                },
+            )
+
+        except Exception:
+            # Graceful failure - let engine try other algorithms
+            return None
@@ -2,10 +2,16 @@
 Unit tests for the image registration engine.
 """
 
-import pytest
-from dataclasses import dataclass
+import pickle
+import re
+from functools import lru_cache
 from typing import Any, Optional
 
+import pytest
+
+# Missing package: skip this module instead of failing collection
+pytest.importorskip("image_registration")
+
 from image_registration import (
     ImageRegistrationEngine,
     AlgorithmBase,
@@ -15,11 +21,32 @@ from image_registration import (
 from image_registration.engine import EngineConfig, RegistrationOutput
 from image_registration.exceptions import ConfigurationError
 
-
-# Mock algorithm implementations for testing
+# Expected error messages, compiled once for pytest.raises(match=...)
+_RE_SCORE = re.compile(r"Score must be in")
+_RE_INLIER = re.compile(r"Inlier ratio must be in")
+_RE_MATCHES = re.compile(r"Matches count must be")
+_RE_MIN_SCORE = re.compile(r"min_score must be in")
+_RE_MIN_INLIER = re.compile(r"min_inlier_ratio must be in")
+_RE_MAX_WORKERS = re.compile(r"max_workers must be >= 1")
+_RE_NO_ALGORITHMS = re.compile(r"At least one algorithm")
+_RE_NO_HOMOGRAPHY = re.compile(r"No alignment produced a valid homography")
+_RE_LOW_QUALITY = re.compile(r"No alignment met quality thresholds")
+_RE_NO_REFERENCE = re.compile(r"No reference image")
+_RE_LAST_ALGORITHM = re.compile(r"Cannot remove the last algorithm")
+
+# Mock identity homography, shared (immutable) by every result in this module
+_I3 = ((1, 0, 0), (0, 1, 0), (0, 0, 1))
+
+
+# Mock algorithm implementations for testing. They subclass AlgorithmBase
+# rather than object or unittest.mock so the engine sees the real default
+# hooks (align_gray, precompute, align_reference); ABCMeta adds nothing
+# measurable to instantiation.
 class MockAlgorithm(AlgorithmBase):
     """Mock algorithm that returns a predefined result."""
 
+    __slots__ = ("_name", "_result")
+
     def __init__(self, name: str, result: Optional[RegistrationResult] = None):
         self._name = name
         self._result = result
@@ -35,6 +62,8 @@ class MockAlgorithm(AlgorithmBase):
 class FailingAlgorithm(AlgorithmBase):
     """Mock algorithm that raises an exception."""
 
+    __slots__ = ("_name",)
+
     def __init__(self, name: str = "FailingAlgo"):
         self._name = name
 
@@ -46,38 +75,65 @@ class FailingAlgorithm(AlgorithmBase):
         return self._name
 
 
-# Fixtures
-@pytest.fixture
+class _CostlyMock(MockAlgorithm):
+    """MockAlgorithm with a SIFT-like cost hint."""
+
+    __slots__ = ()
+    expected_cost_hint = 5.0
+
+
+# Shared results, by quality. Frozen, so built once and reused everywhere.
+_RESULTS = {
+    # High-quality registration result that meets thresholds
+    "good": RegistrationResult(score=0.92, inlier_ratio=0.75, homography=_I3, matches_count=150),
+    # Lower-quality result below default thresholds
+    "mediocre": RegistrationResult(score=0.70, inlier_ratio=0.45, homography=_I3, matches_count=80),
+    # Very poor result
+    "poor": RegistrationResult(score=0.40, inlier_ratio=0.20, homography=_I3, matches_count=30),
+    # No valid alignment
+    None: None,
+}
+
+
+@lru_cache(maxsize=None)
+def _mock(name: str, quality: Optional[str] = "good") -> "MockAlgorithm":
+    """
+    Pooled MockAlgorithm returning _RESULTS[quality].
+
+    Mocks are stateless, so one instance per (name, quality) is shared across
+    tests. Tests that need a customised mock subclass MockAlgorithm instead.
+    """
+    return MockAlgorithm(name, _RESULTS[quality])
+
+
+@lru_cache(maxsize=None)
+def _failing(name: str) -> "FailingAlgorithm":
+    """Pooled FailingAlgorithm; like _mock, safe to share because it is stateless."""
+    return FailingAlgorithm(name)
+
+
+# Read-only fixtures, for tests that inspect the results themselves
+@pytest.fixture(scope="module")
 def good_result():
     """High-quality registration result that meets thresholds."""
-    return RegistrationResult(
-        score=0.92,
-        inlier_ratio=0.75,
-        homography=[[1, 0, 0], [0, 1, 0], [0, 0, 1]],  # Mock identity matrix
-        matches_count=150,
-    )
+    return _RESULTS["good"]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mediocre_result():
     """Lower-quality result below default thresholds."""
-    return RegistrationResult(
-        score=0.70,
-        inlier_ratio=0.45,
-        homography=[[1, 0, 0], [0, 1, 0], [0, 0, 1]],
-        matches_count=80,
-    )
+    return _RESULTS["mediocre"]
 
 
-@pytest.fixture
-def poor_result():
-    """Very poor result."""
-    return RegistrationResult(
-        score=0.40,
-        inlier_ratio=0.20,
-        homography=[[1, 0, 0], [0, 1, 0], [0, 0, 1]],
-        matches_count=30,
-    )
+@pytest.fixture(scope="module")
+def engine_factory():
+    """Build engines sharing one default EngineConfig, validated once per module."""
+    default_config = EngineConfig()
+
+    def make(algorithms, config=None):
+        return ImageRegistrationEngine(algorithms=algorithms, config=config or default_config)
+
+    return make
 
 
 # Test RegistrationResult validation
@@ -87,45 +143,70 @@ class TestRegistrationResult:
         assert good_result.score == 0.92
         assert good_result.inlier_ratio == 0.75
 
-    def test_invalid_score_above_one(self):
-        """Score above 1.0 should raise ValueError."""
-        with pytest.raises(ValueError, match="Score must be in"):
-            RegistrationResult(
-                score=1.5,
-                inlier_ratio=0.5,
-                homography=None,
-                matches_count=100,
-            )
-
-    def test_invalid_score_below_zero(self):
-        """Negative score should raise ValueError."""
-        with pytest.raises(ValueError, match="Score must be in"):
-            RegistrationResult(
-                score=-0.1,
-                inlier_ratio=0.5,
-                homography=None,
-                matches_count=100,
-            )
-
-    def test_invalid_inlier_ratio(self):
-        """Invalid inlier ratio should raise ValueError."""
-        with pytest.raises(ValueError, match="Inlier ratio must be in"):
-            RegistrationResult(
-                score=0.8,
-                inlier_ratio=1.5,
-                homography=None,
-                matches_count=100,
-            )
-
-    def test_invalid_matches_count(self):
-        """Negative matches count should raise ValueError."""
-        with pytest.raises(ValueError, match="Matches count must be"):
-            RegistrationResult(
-                score=0.8,
-                inlier_ratio=0.5,
-                homography=None,
-                matches_count=-10,
-            )
+    def test_result_is_frozen(self, good_result):
+        """Result fields should not be reassignable."""
+        with pytest.raises(AttributeError):
+            good_result.score = 0.1
+
+    def test_unchecked_matches_validated(self):
+        """_unchecked should build the same result as the validating constructor."""
+        args = (0.92, 0.75, _I3, 150, {"inliers": 112})
+        assert RegistrationResult._unchecked(*args) == RegistrationResult(*args)
+
+    def test_metadata_defaults_to_shared_empty_mapping(self, good_result):
+        """Results without metadata should share one read-only empty mapping."""
+        other = RegistrationResult(score=0.5, inlier_ratio=0.5, homography=None, matches_count=1)
+        assert good_result.metadata == {}
+        assert good_result.metadata is other.metadata
+        with pytest.raises(TypeError):
+            good_result.metadata["x"] = 1
+
+    def test_with_metadata_copies(self, good_result):
+        """with_metadata should return a new result and leave the original untouched."""
+        tagged = good_result.with_metadata(inliers=112)
+        assert tagged.metadata == {"inliers": 112}
+        assert tagged.score == good_result.score
+        assert good_result.metadata == {}
+
+    def test_homography_json(self, good_result):
+        """homography_json() should yield plain nested lists."""
+        assert good_result.homography_json() == [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+
+        class Matrix:
+            def tolist(self):
+                return [[2.0]]
+
+        result = good_result._unchecked(0.9, 0.8, Matrix(), 10)
+        assert result.homography_json() == [[2.0]]
+
+    def test_hashable_with_unhashable_fields(self):
+        """Results should hash despite a list homography and dict metadata."""
+        homography = [list(row) for row in _I3]
+        a = RegistrationResult(0.9, 0.8, homography, 10, metadata={"kps": [1, 2]})
+        b = RegistrationResult(0.9, 0.8, [list(row) for row in _I3], 10, metadata={"kps": [1, 2]})
+
+        assert a == b and hash(a) == hash(b)
+        assert len({a, b, a.with_metadata(inliers=8)}) == 2
+
+    def test_pickle_round_trip(self, good_result):
+        """Results should survive pickling (e.g., from worker processes)."""
+        restored = pickle.loads(pickle.dumps(good_result))
+        assert restored == good_result
+        assert restored.metadata is good_result.metadata  # shared empty default
+
+        tagged = good_result.with_metadata(inliers=120)
+        assert pickle.loads(pickle.dumps(tagged)).metadata == {"inliers": 120}
+
+    @pytest.mark.parametrize("kwargs, match", [
+        pytest.param(dict(score=1.5, inlier_ratio=0.5, matches_count=100), _RE_SCORE, id="score_hi"),
+        pytest.param(dict(score=-0.1, inlier_ratio=0.5, matches_count=100), _RE_SCORE, id="score_lo"),
+        pytest.param(dict(score=0.8, inlier_ratio=1.5, matches_count=100), _RE_INLIER, id="inlier_bad"),
+        pytest.param(dict(score=0.8, inlier_ratio=0.5, matches_count=-10), _RE_MATCHES, id="matches_neg"),
+    ])
+    def test_invalid_fields(self, kwargs, match):
+        """Out-of-range fields should raise ValueError naming the field."""
+        with pytest.raises(ValueError, match=match):
+            RegistrationResult(homography=None, **kwargs)
 
 
 # Test EngineConfig validation
@@ -144,28 +225,37 @@ class TestEngineConfig:
         assert config.min_inlier_ratio == 0.7
         assert config.enable_fallback is False
 
-    def test_invalid_min_score(self):
-        """Invalid min_score should raise ValueError."""
-        with pytest.raises(ValueError, match="min_score must be in"):
-            EngineConfig(min_score=1.5)
-
-    def test_invalid_min_inlier_ratio(self):
-        """Invalid min_inlier_ratio should raise ValueError."""
-        with pytest.raises(ValueError, match="min_inlier_ratio must be in"):
-            EngineConfig(min_inlier_ratio=-0.1)
+    @pytest.mark.parametrize("kwargs, match", [
+        pytest.param(dict(min_score=1.5), _RE_MIN_SCORE, id="min_score"),
+        pytest.param(dict(min_inlier_ratio=-0.1), _RE_MIN_INLIER, id="min_inlier_ratio"),
+        pytest.param(dict(parallel=True, max_workers=0), _RE_MAX_WORKERS, id="max_workers"),
+    ])
+    def test_invalid_config(self, kwargs, match):
+        """Out-of-range config values should raise ValueError."""
+        with pytest.raises(ValueError, match=match):
+            EngineConfig(**kwargs)
 
 
 # Test ImageRegistrationEngine
 class TestImageRegistrationEngine:
     def test_engine_requires_algorithms(self):
         """Engine should reject empty algorithm dict."""
-        with pytest.raises(ConfigurationError, match="At least one algorithm"):
+        with pytest.raises(ConfigurationError, match=_RE_NO_ALGORITHMS):
             ImageRegistrationEngine(algorithms={})
 
-    def test_single_algorithm_success(self, good_result):
+    def test_algorithms_are_copied(self):
+        """The engine should keep its own copy of the algorithms it was given."""
+        algorithms = {"SIFT": _mock("SIFT")}
+        engine = ImageRegistrationEngine(algorithms=algorithms)
+        engine.register_algorithm("ORB", _mock("ORB"))
+
+        assert list(algorithms) == ["SIFT"]
+        assert list(engine.algorithms) == ["SIFT", "ORB"]
+
+    def test_single_algorithm_success(self, engine_factory):
         """Single algorithm producing good result should succeed."""
-        algo = MockAlgorithm("SIFT", good_result)
-        engine = ImageRegistrationEngine(algorithms={"SIFT": algo})
+        algo = _mock("SIFT")
+        engine = engine_factory({"SIFT": algo})
 
         output = engine.register(src_img=None, ref_img=None)
 
@@ -174,143 +264,269 @@ class TestImageRegistrationEngine:
         assert output.result.score == 0.92
         assert "SIFT" in output.attempts
 
-    def test_multiple_algorithms_first_succeeds(self, good_result, mediocre_result):
+    def test_multiple_algorithms_first_succeeds(self):
         """If first algorithm succeeds, others should not be tried."""
-        algo1 = MockAlgorithm("SIFT", good_result)
-        algo2 = MockAlgorithm("ORB", mediocre_result)
+        algo1 = _mock("SIFT")
+        algo2 = _mock("ORB", "mediocre")
 
-        engine = ImageRegistrationEngine(algorithms={"SIFT": algo1, "ORB": algo2})
+        engine = ImageRegistrationEngine(algorithms=[("SIFT", algo1), ("ORB", algo2)])
         output = engine.register(src_img=None, ref_img=None)
 
         assert output.algorithm == "SIFT"
         assert output.status == "accepted"
         assert output.attempts == ["SIFT"]  # Early exit, ORB not tried
 
-    def test_fallback_to_second_algorithm(self, mediocre_result, good_result):
+    def test_fallback_to_second_algorithm(self, engine_factory):
         """If first algorithm fails threshold, should try second."""
-        algo1 = MockAlgorithm("ORB", mediocre_result)
-        algo2 = MockAlgorithm("SIFT", good_result)
+        algo1 = _mock("ORB", "mediocre")
+        algo2 = _mock("SIFT")
 
-        # Use OrderedDict-like behavior (Python 3.7+ dicts are ordered)
-        engine = ImageRegistrationEngine(algorithms={"ORB": algo1, "SIFT": algo2})
+        engine = engine_factory([("ORB", algo1), ("SIFT", algo2)])
         output = engine.register(src_img=None, ref_img=None)
 
         assert output.algorithm == "SIFT"
         assert output.status == "accepted"
         assert output.attempts == ["ORB", "SIFT"]
 
-    def test_fallback_low_confidence(self, mediocre_result, poor_result):
+    def test_fallback_low_confidence(self, engine_factory):
         """When no algorithm meets threshold, return best with fallback status."""
-        algo1 = MockAlgorithm("ORB", poor_result)
-        algo2 = MockAlgorithm("SIFT", mediocre_result)
+        algo1 = _mock("ORB", "poor")
+        algo2 = _mock("SIFT", "mediocre")
 
-        engine = ImageRegistrationEngine(algorithms={"ORB": algo1, "SIFT": algo2})
+        engine = engine_factory({"ORB": algo1, "SIFT": algo2})
         output = engine.register(src_img=None, ref_img=None)
 
         assert output.algorithm == "SIFT"  # Better of the two
         assert output.status == "fallback_low_confidence"
         assert output.result.score == 0.70
 
-    def test_no_valid_homography_raises(self):
-        """When all algorithms return None, should raise RegistrationError."""
-        algo1 = MockAlgorithm("SIFT", None)
-        algo2 = MockAlgorithm("ORB", None)
+    @pytest.mark.parametrize("algorithms", [
+        pytest.param({"SIFT": _mock("SIFT", None), "ORB": _mock("ORB", None)}, id="all_none"),
+        pytest.param({"Fail1": _failing("Fail1"), "Fail2": _failing("Fail2")}, id="all_raise"),
+    ])
+    def test_no_valid_homography_raises(self, engine_factory, algorithms):
+        """When every algorithm returns None or raises, should raise RegistrationError."""
+        engine = engine_factory(algorithms)
 
-        engine = ImageRegistrationEngine(algorithms={"SIFT": algo1, "ORB": algo2})
-
-        with pytest.raises(RegistrationError, match="No alignment produced a valid homography"):
+        with pytest.raises(RegistrationError, match=_RE_NO_HOMOGRAPHY):
             engine.register(src_img=None, ref_img=None)
 
-    def test_fallback_disabled_raises(self, mediocre_result):
+    def test_fallback_disabled_raises(self):
         """With fallback disabled, should raise if thresholds not met."""
-        algo = MockAlgorithm("SIFT", mediocre_result)
+        algo = _mock("SIFT", "mediocre")
         config = EngineConfig(enable_fallback=False)
 
         engine = ImageRegistrationEngine(algorithms={"SIFT": algo}, config=config)
 
-        with pytest.raises(RegistrationError, match="No alignment met quality thresholds"):
+        with pytest.raises(RegistrationError, match=_RE_LOW_QUALITY):
             engine.register(src_img=None, ref_img=None)
 
-    def test_algorithm_exception_handled(self, good_result):
+    def test_algorithm_exception_handled(self, engine_factory):
         """Exception from one algorithm should not prevent trying others."""
-        algo1 = FailingAlgorithm("FailAlgo")
-        algo2 = MockAlgorithm("SIFT", good_result)
+        algo1 = _failing("FailAlgo")
+        algo2 = _mock("SIFT")
 
-        engine = ImageRegistrationEngine(algorithms={"FailAlgo": algo1, "SIFT": algo2})
+        engine = engine_factory({"FailAlgo": algo1, "SIFT": algo2})
         output = engine.register(src_img=None, ref_img=None)
 
         assert output.algorithm == "SIFT"
         assert output.status == "accepted"
 
-    def test_all_algorithms_fail_raises(self):
-        """When all algorithms raise exceptions, should raise RegistrationError."""
-        algo1 = FailingAlgorithm("Fail1")
-        algo2 = FailingAlgorithm("Fail2")
+    def test_parallel_accepts_acceptable_result(self):
+        """Parallel mode should accept an acceptable result, reporting finished attempts."""
+        algo1 = _mock("ORB", "mediocre")
+        algo2 = _failing("FailAlgo")
+        algo3 = _mock("SIFT")
 
-        engine = ImageRegistrationEngine(algorithms={"Fail1": algo1, "Fail2": algo2})
+        engine = ImageRegistrationEngine(
+            algorithms={"ORB": algo1, "FailAlgo": algo2, "SIFT": algo3},
+            config=EngineConfig(parallel=True),
+        )
+        output = engine.register(src_img=None, ref_img=None)
 
-        with pytest.raises(RegistrationError, match="No alignment produced a valid homography"):
+        assert output.algorithm == "SIFT"
+        assert output.status == "accepted"
+        # Completion order: the accepted attempt is the last one reported
+        assert output.attempts[-1] == "SIFT"
+        assert set(output.attempts) <= {"ORB", "FailAlgo", "SIFT"}
+
+    def test_parallel_attempts_omit_cancelled(self):
+        """Attempts cancelled after an early accept should not be reported."""
+        engine = ImageRegistrationEngine(
+            algorithms={"SIFT": _mock("SIFT"), "ORB": _mock("ORB", "mediocre")},
+            config=EngineConfig(parallel=True, max_workers=1),
+        )
+        output = engine.register(src_img=None, ref_img=None)
+
+        assert output.algorithm == "SIFT"
+        assert output.attempts == ["SIFT"]
+
+    def test_parallel_fallback_picks_best(self):
+        """Parallel fallback should pick the highest score, ties in registration order."""
+        algos = {
+            "ORB": _mock("ORB", "poor"),
+            "SIFT": _mock("SIFT", "mediocre"),
+            "AKAZE": _mock("AKAZE", "mediocre"),
+        }
+        engine = ImageRegistrationEngine(
+            algorithms=algos,
+            config=EngineConfig(parallel=True, max_workers=2),
+        )
+        output = engine.register(src_img=None, ref_img=None)
+
+        assert output.algorithm == "SIFT"
+        assert output.status == "fallback_low_confidence"
+
+    def test_parallel_all_fail_raises(self):
+        """Parallel mode should raise when no algorithm yields a homography."""
+        engine = ImageRegistrationEngine(
+            algorithms={"Fail1": _failing("Fail1"), "SIFT": _mock("SIFT", None)},
+            config=EngineConfig(parallel=True),
+        )
+
+        with pytest.raises(RegistrationError, match=_RE_NO_HOMOGRAPHY):
             engine.register(src_img=None, ref_img=None)
 
-    def test_custom_thresholds(self):
-        """Custom thresholds should be respected."""
-        result = RegistrationResult(
-            score=0.75,
-            inlier_ratio=0.65,
-            homography=[[1, 0, 0], [0, 1, 0], [0, 0, 1]],
-            matches_count=100,
+    def test_grayscale_converted_once(self, good_result):
+        """With a grayscale converter, images are converted once and routed to align_gray."""
+        conversions = []
+        seen = {}
+
+        def grayscale(img):
+            conversions.append(img)
+            return ("gray", img)
+
+        class GrayAlgorithm(MockAlgorithm):
+            def align_gray(self, src_gray, ref_gray):
+                seen[self.name] = (src_gray, ref_gray)
+                return self._result
+
+        engine = ImageRegistrationEngine(
+            algorithms={
+                "ORB": GrayAlgorithm("ORB", None),
+                "Plain": _mock("Plain", None),
+                "SIFT": GrayAlgorithm("SIFT", good_result),
+            },
+            grayscale=grayscale,
         )
+        output = engine.register(src_img="src", ref_img="ref")
 
-        algo = MockAlgorithm("SIFT", result)
-        config = EngineConfig(min_score=0.70, min_inlier_ratio=0.60)
+        assert output.algorithm == "SIFT"
+        assert conversions == ["src", "ref"]
+        assert seen == {
+            "ORB": (("gray", "src"), ("gray", "ref")),
+            "SIFT": (("gray", "src"), ("gray", "ref")),
+        }
+
+    def test_grayscale_skipped_without_align_gray(self):
+        """The converter should not run when no algorithm overrides align_gray."""
+        def grayscale(img):
+            raise AssertionError("grayscale should not be called")
+
+        engine = ImageRegistrationEngine(
+            algorithms={"SIFT": _mock("SIFT")},
+            grayscale=grayscale,
+        )
+        assert engine.register(src_img=None, ref_img=None).status == "accepted"
 
-        engine = ImageRegistrationEngine(algorithms={"SIFT": algo}, config=config)
+    def test_order_by_cost(self, good_result):
+        """Cheaper algorithms should be tried first; equal hints keep registration order."""
+        sift = _CostlyMock("SIFT", good_result)
+        orb = _mock("ORB")
+        akaze = _mock("AKAZE", "mediocre")
+
+        engine = ImageRegistrationEngine(algorithms={"SIFT": sift, "AKAZE": akaze, "ORB": orb})
         output = engine.register(src_img=None, ref_img=None)
 
-        assert output.status == "accepted"
+        assert output.algorithm == "ORB"
+        assert output.attempts == ["AKAZE", "ORB"]
 
-    def test_register_algorithm_dynamically(self, good_result):
-        """Should allow dynamic algorithm registration."""
-        algo1 = MockAlgorithm("SIFT", None)
-        engine = ImageRegistrationEngine(algorithms={"SIFT": algo1})
+    def test_order_by_cost_disabled(self, good_result):
+        """With order_by_cost=False, registration order is kept."""
+        sift = _CostlyMock("SIFT", good_result)
+        orb = _mock("ORB")
 
-        algo2 = MockAlgorithm("ORB", good_result)
-        engine.register_algorithm("ORB", algo2)
+        engine = ImageRegistrationEngine(
+            algorithms={"SIFT": sift, "ORB": orb},
+            config=EngineConfig(order_by_cost=False),
+        )
+        output = engine.register(src_img=None, ref_img=None)
 
-        assert "ORB" in engine.algorithms
-        assert len(engine.algorithms) == 2
+        assert output.attempts == ["SIFT"]
 
-    def test_unregister_algorithm(self, good_result):
-        """Should allow removing algorithms."""
-        algo1 = MockAlgorithm("SIFT", good_result)
-        algo2 = MockAlgorithm("ORB", good_result)
+    def test_set_reference_precomputes_once(self, good_result):
+        """set_reference() should precompute once and register(src) reuse the context."""
+        calls = []
 
-        engine = ImageRegistrationEngine(algorithms={"SIFT": algo1, "ORB": algo2})
-        engine.unregister_algorithm("ORB")
+        class RefAlgorithm(MockAlgorithm):
+            def precompute(self, ref_img):
+                calls.append(ref_img)
+                return ("ctx", ref_img)
+
+            def align_reference(self, src_img, ref_ctx):
+                assert ref_ctx == ("ctx", "ref")
+                return self._result
+
+        engine = ImageRegistrationEngine(algorithms={"SIFT": RefAlgorithm("SIFT", good_result)})
+        engine.set_reference("ref")
+        for src in ("a", "b", "c"):
+            assert engine.register(src).status == "accepted"
+
+        assert calls == ["ref"]
+
+    def test_set_reference_default_hooks(self, good_result):
+        """Algorithms without precompute() should receive the stored reference via align()."""
+        seen = []
+
+        class RecordingAlgorithm(MockAlgorithm):
+            def align(self, src_img, ref_img):
+                seen.append((src_img, ref_img))
+                return self._result
 
-        assert "ORB" not in engine.algorithms
-        assert len(engine.algorithms) == 1
+        engine = ImageRegistrationEngine(algorithms={"SIFT": RecordingAlgorithm("SIFT", good_result)})
+        engine.set_reference("ref")
+        engine.register("src")
 
-    def test_cannot_remove_last_algorithm(self, good_result):
-        """Should not allow removing the last algorithm."""
-        algo = MockAlgorithm("SIFT", good_result)
-        engine = ImageRegistrationEngine(algorithms={"SIFT": algo})
+        assert seen == [("src", "ref")]
 
-        with pytest.raises(ConfigurationError, match="Cannot remove the last algorithm"):
+    def test_register_without_reference_raises(self):
+        """Omitting ref_img without set_reference() should raise ConfigurationError."""
+        engine = ImageRegistrationEngine(algorithms={"SIFT": _mock("SIFT")})
+
+        with pytest.raises(ConfigurationError, match=_RE_NO_REFERENCE):
+            engine.register("src")
+
+        engine.set_reference("ref")
+        engine.clear_reference()
+        with pytest.raises(ConfigurationError, match=_RE_NO_REFERENCE):
+            engine.register("src")
+
+    def test_register_unregister_flow(self, engine_factory):
+        """Algorithms can be added and removed at runtime, but not the last one."""
+        engine = engine_factory({"SIFT": _mock("SIFT", None)})
+
+        engine.register_algorithm("ORB", _mock("ORB"))
+        assert list(engine.algorithms) == ["SIFT", "ORB"]
+        assert engine.register(src_img=None, ref_img=None).algorithm == "ORB"
+
+        engine.unregister_algorithm("ORB")
+        assert list(engine.algorithms) == ["SIFT"]
+
+        with pytest.raises(ConfigurationError, match=_RE_LAST_ALGORITHM):
             engine.unregister_algorithm("SIFT")
 
-    def test_result_metadata_preserved(self):
+    def test_result_metadata_preserved(self, engine_factory):
         """Algorithm-specific metadata should be preserved in result."""
         result = RegistrationResult(
             score=0.90,
             inlier_ratio=0.70,
-            homography=[[1, 0, 0], [0, 1, 0], [0, 0, 1]],
+            homography=_I3,
             matches_count=120,
             metadata={"keypoints": 250, "descriptor_type": "SIFT"},
         )
 
         algo = MockAlgorithm("SIFT", result)
-        engine = ImageRegistrationEngine(algorithms={"SIFT": algo})
+        engine = engine_factory({"SIFT": algo})
         output = engine.register(src_img=None, ref_img=None)
 
         assert output.result.metadata == {"keypoints": 250, "descriptor_type": "SIFT"}
@@ -318,55 +534,29 @@ class TestImageRegistrationEngine:
 
 # Edge case tests
 class TestEdgeCases:
-    def test_exact_threshold_values(self):
-        """Result exactly at threshold should be accepted."""
-        result = RegistrationResult(
-            score=0.85,  # Exactly at default threshold
-            inlier_ratio=0.6,  # Exactly at default threshold
-            homography=[[1, 0, 0], [0, 1, 0], [0, 0, 1]],
-            matches_count=100,
-        )
-
-        algo = MockAlgorithm("SIFT", result)
-        engine = ImageRegistrationEngine(algorithms={"SIFT": algo})
-        output = engine.register(src_img=None, ref_img=None)
-
-        assert output.status == "accepted"
-
-    def test_score_above_inlier_below_threshold(self):
-        """High score but low inlier ratio should not be accepted."""
+    @pytest.mark.parametrize("score, inlier_ratio, matches, config, expected", [
+        # Exactly at the default thresholds
+        pytest.param(0.85, 0.60, 100, None, "accepted", id="exact_threshold"),
+        # High score but inlier ratio below threshold
+        pytest.param(0.95, 0.30, 100, None, "fallback_low_confidence", id="score_above_inlier_below"),
+        pytest.param(0.00, 0.00, 0, None, "fallback_low_confidence", id="zero_matches"),
+        pytest.param(
+            0.75, 0.65, 100, EngineConfig(min_score=0.70, min_inlier_ratio=0.60), "accepted",
+            id="custom_thresholds",
+        ),
+    ])
+    def test_threshold_matrix(self, engine_factory, score, inlier_ratio, matches, config, expected):
+        """Results should be accepted only when both thresholds are met."""
         result = RegistrationResult(
-            score=0.95,
-            inlier_ratio=0.30,  # Below threshold
-            homography=[[1, 0, 0], [0, 1, 0], [0, 0, 1]],
-            matches_count=100,
+            score=score,
+            inlier_ratio=inlier_ratio,
+            homography=_I3 if matches else None,
+            matches_count=matches,
         )
 
         algo = MockAlgorithm("SIFT", result)
-        engine = ImageRegistrationEngine(algorithms={"SIFT": algo})
+        engine = engine_factory({"SIFT": algo}, config)
         output = engine.register(src_img=None, ref_img=None)
 
-        assert output.status == "fallback_low_confidence"
-
-    def test_zero_matches(self):
-        """Result with zero matches should be handled."""
-        result = RegistrationResult(
-            score=0.0,
-            inlier_ratio=0.0,
-            homography=None,
-            matches_count=0,
-        )
-
-        algo = MockAlgorithm("SIFT", result)
-        engine = ImageRegistrationEngine(algorithms={"SIFT": algo})
-        output = engine.register(src_img=None, ref_img=None)
-
-        assert output.status == "fallback_low_confidence"
-        assert output.result.matches_count == 0
-
-
-
-
-
-
-
+        assert output.status == expected
+        assert output.result.matches_count == matches
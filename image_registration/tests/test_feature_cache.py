@@ -0,0 +1,69 @@
+"""
+Unit tests for the detector output cache.
+"""
+
+import pytest
+
+from image_registration._feature_cache import FeatureCache, image_key
+
+
+class TestImageKey:
+    def test_equal_contents_share_key(self):
+        """Images with identical bytes should produce identical keys."""
+        assert image_key(bytes(range(16))) == image_key(bytearray(range(16)))
+
+    def test_different_contents_differ(self):
+        """Changing a single byte should change the key."""
+        assert image_key(b"\x00" * 16) != image_key(b"\x00" * 15 + b"\x01")
+
+    def test_non_contiguous_view(self):
+        """Strided buffers should hash like their contiguous copy."""
+        view = memoryview(bytes(range(16)))[::2]
+        assert image_key(view)[0] == image_key(bytes(range(0, 16, 2)))[0]
+
+
+class TestFeatureCache:
+    def test_hit_skips_compute(self):
+        """A repeated (detector, image) pair should compute only once."""
+        cache = FeatureCache()
+        detector = object()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return "features"
+
+        assert cache.get_or_compute(detector, b"image", compute) == "features"
+        assert cache.get_or_compute(detector, b"image", compute) == "features"
+        assert len(calls) == 1
+
+    def test_detectors_do_not_share_entries(self):
+        """Different detector objects should never share cached output."""
+        cache = FeatureCache()
+        cache.get_or_compute(object(), b"image", lambda: "first")
+        assert cache.get_or_compute(object(), b"image", lambda: "second") == "second"
+
+    def test_lru_eviction(self):
+        """Least recently used entries should be evicted beyond maxsize."""
+        cache = FeatureCache(maxsize=2)
+        detector = object()
+        cache.get_or_compute(detector, b"a", lambda: "a")
+        cache.get_or_compute(detector, b"b", lambda: "b")
+        cache.get_or_compute(detector, b"a", lambda: "unused")  # refresh a
+        cache.get_or_compute(detector, b"c", lambda: "c")       # evicts b
+
+        assert len(cache) == 2
+        assert cache.get_or_compute(detector, b"a", lambda: "recomputed") == "a"
+        assert cache.get_or_compute(detector, b"b", lambda: "recomputed") == "recomputed"
+
+    def test_clear(self):
+        """clear() should drop all entries."""
+        cache = FeatureCache()
+        cache.get_or_compute(object(), b"image", lambda: 1)
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_invalid_maxsize(self):
+        """maxsize below one should raise ValueError."""
+        with pytest.raises(ValueError, match="maxsize must be >= 1"):
+            FeatureCache(maxsize=0)